@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Runs all Daily Checks in one long-running process with a built-in scheduler,
+a shared connection pool and an in-memory device inventory. Check status is
+served as JSON on a local health endpoint.
+
+Author: Ben Rillie <ben@treducks.tech>
+WARNING: Use at your own risk.
+License: MIT
+"""
+
+import argparse
+import signal
+
+from dailychecks.checks import CHECKS, load
+from dailychecks.config import Config
+from dailychecks.inventory import Inventory
+from dailychecks.kandji import KandjiClient
+from dailychecks.metrics import SnapshotCache
+from dailychecks.scheduler import ScheduledCheck, Scheduler, serve_health
+
+DEFAULT_INTERVAL_MINUTES = 24 * 60
+
+# Function to parse NAME=MINUTES interval overrides
+def parse_interval(value):
+    name, _, minutes = value.partition("=")
+    if name not in CHECKS:
+        raise argparse.ArgumentTypeError(f"unknown check {name!r}, expected one of {', '.join(CHECKS)}")
+    try:
+        return name, float(minutes)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid interval {value!r}, expected NAME=MINUTES")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the Daily Checks on a schedule in one process.")
+    parser.add_argument("--interval", metavar="NAME=MINUTES", type=parse_interval, action="append", default=[],
+                        help=f"run a check every MINUTES (default {DEFAULT_INTERVAL_MINUTES}), repeatable")
+    parser.add_argument("--only", metavar="NAME", choices=list(CHECKS), action="append",
+                        help="only schedule the named check, repeatable")
+    parser.add_argument("--jitter", metavar="SECONDS", type=float, default=300,
+                        help="random delay added to every run (default 300)")
+    parser.add_argument("--inventory-max-age", metavar="SECONDS", type=float, default=300,
+                        help="reuse the device list for this long between checks (default 300)")
+    parser.add_argument("--host", default="127.0.0.1", help="health endpoint address (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8787, help="health endpoint port (default 8787)")
+    parser.add_argument("--delta", action="store_true", help="only post results that changed since the previous run")
+    parser.add_argument("--state-dir", metavar="DIR", help="where run state is kept")
+    parser.add_argument("--debug", action="store_true", help="print full API payloads while running")
+    return parser.parse_args(argv)
+
+# Function to wrap a check module so it runs against the shared inventory
+def make_runner(module, check_args, inventory, config):
+    def run(stats):
+        inventory.client.stats = stats
+        module.main(stats, check_args, inventory, config)
+    return run
+
+def main():
+    args = parse_args()
+
+    # Check if all required environment variables are set
+    config = Config.from_env()
+    missing_vars = config.missing()
+    if missing_vars:
+        print(f"Missing environment variables: {', '.join(missing_vars)}")
+        exit(1)
+
+    client = KandjiClient(config.base_url, config.api_token)
+    inventory = Inventory(client, max_age=args.inventory_max_age)
+    check_args = argparse.Namespace(profile=None, summary=None, debug=args.debug,
+                                    delta=args.delta, state_dir=args.state_dir, resume=True,
+                                    shard=None, merge=None, shard_dir=None)
+
+    intervals = dict(args.interval)
+    checks = [
+        ScheduledCheck(name, make_runner(load(name), check_args, inventory, config),
+                       intervals.get(name, DEFAULT_INTERVAL_MINUTES) * 60, jitter=args.jitter, debug=args.debug)
+        for name in CHECKS
+        if not args.only or name in args.only
+    ]
+
+    scheduler = Scheduler(checks)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    server = serve_health(scheduler, args.host, args.port, cache=SnapshotCache(args.state_dir))
+    print(f"Health endpoint on http://{args.host}:{args.port}/health, metrics on /metrics")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print("Daemon stopped.")
+
+if __name__ == '__main__':
+    main()
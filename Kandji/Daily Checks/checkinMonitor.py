@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Watches device check-ins continuously and posts to Slack as soon as a device
+goes more than 24 hours without checking in, and again when it comes back.
+Devices are kept in a min-heap keyed by the time they go stale, updated from
+periodic inventory refreshes and from events posted to a local webhook receiver.
+
+Author: Ben Rillie <ben@treducks.tech>
+WARNING: Use at your own risk.
+License: MIT
+"""
+
+import argparse
+import hmac
+import json
+import os
+import signal
+import threading
+import time
+
+import requests
+
+from dailychecks import slack
+from dailychecks.config import Config
+from dailychecks.inventory import Inventory
+from dailychecks.kandji import KandjiClient
+from dailychecks.httpd import MetricsHandler, make_server
+from dailychecks.staleness import StalenessMonitor
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Posts devices to Slack as soon as they stop checking in.")
+    parser.add_argument("--hours", type=float, default=24, help="hours without a check-in before a device is stale (default 24)")
+    parser.add_argument("--refresh", metavar="MINUTES", type=float, default=15,
+                        help="how often the device list is refreshed (default 15)")
+    parser.add_argument("--post-interval", metavar="SECONDS", type=float, default=300,
+                        help="collect changes for this long before posting them together (default 300)")
+    parser.add_argument("--report-existing", action="store_true",
+                        help="post devices that are already stale at startup")
+    parser.add_argument("--host", default="127.0.0.1", help="webhook receiver address (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8788, help="webhook receiver port (default 8788)")
+    return parser.parse_args(argv)
+
+class WebhookHandler(MetricsHandler):
+    monitor = None
+    secret = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] in ("/", "/health"):
+            self.send_body(200, "application/json", json.dumps(self.monitor.status(), indent=2))
+        else:
+            self.send_body(404, "text/plain", "Not found\n")
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/events":
+            return self.send_body(404, "text/plain", "Not found\n")
+        if self.secret and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.secret}"):
+            return self.send_body(401, "text/plain", "Unauthorized\n")
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            events = body if isinstance(body, list) else [body]
+            # Check every event first so a bad one does not leave the batch half applied
+            for event in events:
+                self.monitor.check_event(event)
+            for event in events:
+                self.monitor.apply_event(event)
+        except ValueError as e:
+            return self.send_body(400, "text/plain", f"Bad event: {e}\n")
+        self.send_body(202, "application/json", json.dumps({"accepted": len(events)}))
+
+# Function to describe the devices that went stale or came back
+def format_changes(hours, stale, recovered):
+    lines = []
+    if stale:
+        lines.append(f"{len(stale)} devices have not checked in for more than {hours:g} hours:")
+        for device in stale:
+            lines.append(f"Device Name: {device.device_name}, Platform: {device.platform or 'Unknown'}, "
+                         f"User: {device.user or 'Unknown'}, Last Check-in: {device.last_check_in}")
+    if recovered:
+        if lines:
+            lines.append("")
+        lines.append(f"{len(recovered)} devices checked in again:")
+        lines.extend(f"Device Name: {device.device_name}" for device in recovered)
+    return "\n".join(lines)
+
+def main():
+    args = parse_args()
+
+    # Check if all required environment variables are set
+    config = Config.from_env()
+    missing_vars = config.missing()
+    if missing_vars:
+        print(f"Missing environment variables: {', '.join(missing_vars)}")
+        exit(1)
+
+    inventory = Inventory(KandjiClient(config.base_url, config.api_token))
+    monitor = StalenessMonitor(args.hours)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: (stop.set(), monitor.wake.set()))
+
+    # Start from the full device list, then only apply changes
+    try:
+        monitor.sync(inventory.devices())
+    except requests.RequestException as e:
+        print(f"Error fetching devices: {e}")
+        exit(2)
+    next_refresh = time.time() + args.refresh * 60
+    stale, _ = monitor.collect()
+    print(f"Tracking {len(monitor.devices)} devices, {len(stale)} already stale.")
+    if stale and args.report_existing:
+        slack.send(inventory.client, config, format_changes(args.hours, stale, []))
+
+    server = make_server(args.host, args.port, WebhookHandler, monitor=monitor,
+                         secret=os.getenv('KANDJI_WEBHOOK_SECRET'))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Receiving events on http://{args.host}:{args.port}/events, status on /health")
+
+    pending_stale, pending_recovered = [], []
+    last_post = 0.0
+    try:
+        while not stop.is_set():
+            if time.time() >= next_refresh:
+                next_refresh = time.time() + args.refresh * 60
+                try:
+                    inventory.refresh()
+                    print(f"Device list refreshed, {monitor.sync(inventory.device_list)} devices changed.")
+                except requests.RequestException as e:
+                    print(f"Error refreshing devices: {e}")
+
+            stale, recovered = monitor.collect()
+            pending_stale += stale
+            pending_recovered += recovered
+            if (pending_stale or pending_recovered) and time.time() - last_post >= args.post_interval:
+                if slack.send(inventory.client, config, format_changes(args.hours, pending_stale, pending_recovered)):
+                    pending_stale, pending_recovered = [], []
+                last_post = time.time()
+
+            # Sleep until the next device goes stale, the next refresh or post, or an event arrives
+            wake_at = next_refresh
+            deadline = monitor.next_deadline()
+            if deadline is not None:
+                wake_at = min(wake_at, deadline)
+            if pending_stale or pending_recovered:
+                wake_at = min(wake_at, last_post + args.post_interval)
+            monitor.wake.wait(max(0.0, wake_at - time.time()))
+            monitor.wake.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print("Monitor stopped.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the Kandji Daily Checks.
+
+Author: Ben Rillie <ben@treducks.tech>
+WARNING: Use at your own risk.
+License: MIT
+"""
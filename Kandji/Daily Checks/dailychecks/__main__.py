@@ -0,0 +1,30 @@
+"""
+Runs a Daily Check by name, e.g.
+
+    python3 -m dailychecks hardDrive70 --delta
+    python3 -m dailychecks --list
+"""
+
+import sys
+
+from .checks import CHECKS
+from .cli import run_check
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help", "--list"):
+        print("usage: python3 -m dailychecks CHECK [options]\n\nchecks:")
+        for name, (description, _) in CHECKS.items():
+            print(f"  {name:<16}{description}")
+        return 0 if argv else 2
+    name = argv[0]
+    if name not in CHECKS:
+        print(f"Unknown check {name!r}, expected one of {', '.join(CHECKS)}", file=sys.stderr)
+        return 2
+    run_check(name, argv[1:], prog=f"python3 -m dailychecks {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+The Daily Checks. Each module has a main(stats, args, inventory=None,
+config=None) that fetches what it needs, builds the report with pure functions
+that can be imported and reused without network access, and posts it to Slack.
+
+Modules are only imported when a check runs, so listing checks or printing
+--help does not pay for requests or packaging.
+"""
+
+import importlib
+
+# name -> (description, whether it scans every device and supports resuming and sharding)
+CHECKS = {
+    "checkin24Hours": ("Lists devices that have not checked in within the last day.", False),
+    "errorCheck": ("Collects library item errors for each device.", True),
+    "hardDrive70": ("Reports machines where the main volume is more than 70% full.", True),
+    "latestOScheck": ("Lists devices that are not running the latest macOS or iOS version.", False),
+}
+
+
+class CheckError(Exception):
+    """A check could not finish. status is the exit status when the check runs from the command line."""
+
+    def __init__(self, message, status=1):
+        super().__init__(message)
+        self.status = status
+
+
+def load(name):
+    if name not in CHECKS:
+        raise KeyError(f"unknown check {name!r}, expected one of {', '.join(CHECKS)}")
+    return importlib.import_module(f"{__name__}.{name}")
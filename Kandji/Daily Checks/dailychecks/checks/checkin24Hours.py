@@ -0,0 +1,111 @@
+"""
+Lists devices that have not checked in within the last day using the Kandji API
+and posts the results to Slack.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from . import CheckError
+from .. import metrics, slack
+from ..config import Config
+from ..delta import DeltaTracker, Entry, format_delta
+from ..inventory import Inventory
+from ..kandji import KandjiClient
+
+# Function to check if last check-in is more than 24 hours ago
+def is_more_than_24_hours_ago(check_in_time):
+    try:
+        check_in_datetime = datetime.fromisoformat(check_in_time.rstrip("Z"))
+        check_in_datetime = check_in_datetime.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - check_in_datetime > timedelta(hours=24)
+    except ValueError as e:
+        print(f"Error parsing check-in time: {e}")
+        return False
+
+# Function to get the hours since the last check-in, or None if it cannot be parsed
+def hours_since_check_in(check_in_time):
+    try:
+        check_in_datetime = datetime.fromisoformat(check_in_time.rstrip("Z")).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return (datetime.now(timezone.utc) - check_in_datetime).total_seconds() / 3600
+
+# Function to filter devices excluding those with the tag "exclude_24"
+def devices_over_24_hours(devices):
+    return [
+        device for device in devices
+        if is_more_than_24_hours_ago(device.last_check_in or "") and "exclude_24" not in device.tags
+    ]
+
+# Function to build the report entries for devices that have not checked in
+def build_entries(devices):
+    entries = []
+    for device in devices:
+        platform = device.platform or "Unknown"
+        user_name = device.user or "Unknown"
+        line = (f"Device Name: {device.device_name}\n"
+                f"Platform: {platform}\n"
+                f"User: {user_name}\n")
+        entries.append(Entry(device.device_id, device.device_name,
+                             [device.device_name, platform, user_name, device.last_check_in], line))
+    return entries
+
+# Function to export check-in staleness for the fleet exporter
+def metric_families(devices, stale):
+    ages = [hours_since_check_in(device.last_check_in or "") for device in devices
+            if "exclude_24" not in device.tags]
+    return [
+        metrics.histogram("kandji_device_checkin_age_hours", "Hours since each device last checked in.",
+                          metrics.STALENESS_BUCKETS_HOURS, [age for age in ages if age is not None]),
+        metrics.gauge("kandji_devices_checkin_over_24h", "Devices that have not checked in for more than 24 hours.",
+                      [({}, len(stale))]),
+    ]
+
+def main(stats, args, inventory=None, config=None):
+    import requests
+
+    # Check if all required environment variables are set
+    config = config or Config.from_env()
+    missing_vars = config.missing()
+    if missing_vars:
+        raise CheckError(f"Missing environment variables: {', '.join(missing_vars)}", 1)
+
+    inventory = inventory or Inventory(KandjiClient(config.base_url, config.api_token, stats))
+    client = inventory.client
+
+    # Making the API request with the API key in headers for authentication
+    try:
+        with stats.timer("fetch devices"):
+            devices = inventory.devices()
+    except requests.RequestException as e:
+        raise CheckError(f"Error fetching devices: {e}", 2)
+
+    with stats.timer("filter devices"):
+        stale = devices_over_24_hours(devices)
+
+    with stats.timer("write metrics"):
+        metrics.write_snapshot("checkin24Hours", metric_families(devices, stale), args.state_dir)
+
+    entries = build_entries(stale)
+
+    # Preparing message
+    tracker = None
+    if args.delta:
+        tracker = DeltaTracker("checkin24Hours", args.state_dir)
+        message = format_delta("Devices that have not checked in for more than 24 hours:", tracker.compare(entries))
+    elif entries:
+        message = "These devices have not checked in for more than 24 hours:\n"
+        for entry in entries:
+            message += entry.line + "\n"
+    else:
+        message = "All devices have checked in over the last 24 hours."
+
+    # Send the message to Slack
+    if message is None:
+        print("No changes since the last run, nothing posted to Slack.")
+    else:
+        with stats.timer("send to slack"):
+            if not slack.send(client, config, message):
+                raise CheckError("Could not post the report to Slack.", 3)
+    if tracker:
+        tracker.save()
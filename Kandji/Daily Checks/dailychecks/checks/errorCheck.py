@@ -0,0 +1,81 @@
+"""
+Collects Kandji library item errors for each device and sends a summary to Slack.
+"""
+
+from .. import metrics, scan
+from ..config import Config
+from ..delta import Entry
+from ..inventory import Inventory
+from ..kandji import KandjiClient
+
+# Function to turn a device's /status response into one entry per failed library item
+def device_errors(device, status_data):
+    device_id = device.device_id
+    device_name = device.device_name or "Unknown"
+    entries = []
+    for item in status_data.get("library_items", []):
+        if item.get("status") == "ERROR":
+            error_log = item.get("log", "No log available")
+            # Split the error log into lines and take the first two
+            error_log_lines = error_log.splitlines()[:2]
+            # Join the first two lines back into a string
+            error_log_summary = "\n".join(error_log_lines)
+            entries.append(Entry(
+                f"{device_id}:{item.get('name')}",
+                f"{device_name}: {item.get('name')}",
+                [device_name, item.get('name')],
+                f"Device: {device_name}\n"
+                f"Item: {item.get('name')}\n"
+                f"Error Log: {error_log_summary}\n"
+            ))
+    return entries
+
+# Function to collect the library item errors of each device
+def scan_devices(inventory, devices, journal):
+    results = {}  # device_id -> [Entry, ...], or None when the status could not be fetched
+    for device in devices:
+        device_id = device.device_id
+
+        # Reuse the results of devices finished before an interrupted run stopped
+        if device_id in journal.done:
+            results[device_id] = journal.done[device_id]
+            continue
+
+        # Query the device status
+        status_data = inventory.device_status(device_id)
+
+        if status_data is None:
+            results[device_id] = None
+            continue
+        device_entries = device_errors(device, status_data)
+        journal.record(device_id, device_entries)
+        results[device_id] = device_entries
+    return results
+
+# Function to export error counts per library item for the fleet exporter
+def metric_families(entries):
+    error_counts = {}
+    for entry in entries:
+        error_counts[entry.fields[1]] = error_counts.get(entry.fields[1], 0) + 1
+    return [
+        metrics.gauge("kandji_library_item_errors", "Devices reporting an error for each library item.",
+                      [({"item": item}, count) for item, count in sorted(error_counts.items())]),
+        metrics.gauge("kandji_library_item_errors_total", "Library item errors across all devices.",
+                      [({}, len(entries))]),
+    ]
+
+# Function to build the report from the library item errors of each device
+def build_report(results):
+    entries = [Entry(*entry) for device_entries in results.values() for entry in device_entries]
+    if entries:
+        message = "Device Errors Detected:\n" + "\n".join(entry.line for entry in entries)
+    else:
+        message = "No device errors detected."
+    return scan.Report(entries, metric_families(entries), "Device Errors Detected:", message)
+
+def main(stats, args, inventory=None, config=None):
+    config = config or Config.from_env()
+    inventory = inventory or Inventory(KandjiClient(config.base_url, config.api_token, stats))
+    scan.run("errorCheck", stats, args, inventory, config,
+             lambda devices, journal: scan_devices(inventory, devices, journal),
+             build_report, what="status")
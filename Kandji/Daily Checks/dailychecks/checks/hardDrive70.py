@@ -0,0 +1,127 @@
+"""
+Reports machines where the main volume is more than 70% full using the Kandji
+API and posts the results to Slack.
+"""
+
+from .. import metrics, scan
+from ..config import Config
+from ..delta import Entry
+from ..inventory import Inventory
+from ..kandji import KandjiClient
+
+# Function to find the Macintosh HD usage and the volumes over 70% in a device's details
+def volume_usage(device, device_details):
+    device_id = device.device_id
+    device_name = device.device_name or 'Unknown'
+    serial_number = device.serial_number or 'Unknown'
+    assigned_user = device_details.user or 'Unknown User'
+    device_volumes = []
+    device_usage = None
+
+    for volume in device_details.volumes:
+        # Only consider volumes named "Macintosh HD"
+        if volume.name == "Macintosh HD":
+            percent_used = volume.percent_used or '0%'
+            try:
+                percent_used = int(percent_used.rstrip('%'))
+            except (AttributeError, ValueError):
+                continue
+            device_usage = [device_name, serial_number, percent_used]
+
+            if percent_used > 69:
+                device_volumes.append({
+                    'device_id': device_id,
+                    'device_name': device_name,
+                    'serial_number': serial_number,
+                    'assigned_user': assigned_user,
+                    'volume_name': volume.name,
+                    'capacity': volume.capacity or 'Unknown',
+                    'available': volume.available or 'Unknown',
+                    'percent_used': f"{percent_used}%"
+                })
+
+    return {'volumes': device_volumes, 'usage': device_usage}
+
+# Function to get hard drive capacity details from each device
+def get_volumes_over_70_percent(inventory, devices, journal=None):
+    # device_id -> {'volumes': [volumes over 70%], 'usage': [device_name, serial_number, percent_used]},
+    # or None when the details could not be fetched
+    results = {}
+
+    for device in devices:
+        device_id = device.device_id
+
+        # Check if the device has the tag "exclude_hd70"
+        if "exclude_hd70" in device.tags:
+            print(f"Skipping device {device_id} due to 'exclude_hd70' tag.")
+            continue
+
+        # Reuse the results of devices finished before an interrupted run stopped
+        if journal and device_id in journal.done:
+            results[device_id] = journal.done[device_id]
+            continue
+
+        device_details = inventory.device_details(device_id)
+        if not device_details:
+            results[device_id] = None
+            continue
+
+        results[device_id] = volume_usage(device, device_details)
+        if journal:
+            journal.record(device_id, results[device_id])
+
+    return results
+
+# Function to flatten per-device results into the volumes over 70% and the disk usage per device
+def summarize(results):
+    volumes_over_70 = []
+    usage = {}  # device_id -> (device_name, serial_number, percent_used)
+    for device_id, result in results.items():
+        volumes_over_70.extend(result['volumes'])
+        if result['usage']:
+            usage[device_id] = tuple(result['usage'])
+    return volumes_over_70, usage
+
+# Function to build the report entries for the volumes over 70%
+def build_entries(volumes_over_70):
+    entries = []
+    for volume in volumes_over_70:
+        line = (
+            f"Device Name: {volume['device_name']}, Serial: {volume['serial_number']}, "
+            f"Assigned User: {volume['assigned_user']}, Volume: {volume['volume_name']}, "
+            f"Used: {volume['percent_used']}"
+        )
+        # Usage is fingerprinted in 5% steps so small day-to-day changes are not reported
+        percent = int(volume['percent_used'].rstrip('%'))
+        entries.append(Entry(volume['device_id'], volume['device_name'],
+                             [volume['serial_number'], volume['assigned_user'], percent // 5 * 5], line))
+    return entries
+
+# Function to export disk usage for the fleet exporter
+def metric_families(volumes_over_70, usage):
+    return [
+        metrics.gauge("kandji_device_disk_used_percent", "Percent of the Macintosh HD volume in use.",
+                      [({"device_id": device_id, "device_name": name, "serial_number": serial}, percent)
+                       for device_id, (name, serial, percent) in usage.items()]),
+        metrics.gauge("kandji_devices_disk_over_70_percent", "Devices whose Macintosh HD volume is more than 70% full.",
+                      [({}, len(volumes_over_70))]),
+    ]
+
+# Function to build the report of the volumes over 70%
+def build_report(results):
+    volumes_over_70, usage = summarize(results)
+    entries = build_entries(volumes_over_70)
+    title = f"{len(volumes_over_70)} volumes found with over 70% usage:"
+    if volumes_over_70:
+        message = title + "\n" + "".join(entry.line + "\n" for entry in entries)
+    else:
+        message = "No volumes found with over 70% usage."
+    return scan.Report(entries, metric_families(volumes_over_70, usage), title, message)
+
+# Main function to pull the device info and filter based on disk usage
+def main(stats, args, inventory=None, config=None):
+    config = config or Config.from_env()
+    inventory = inventory or Inventory(KandjiClient(config.base_url, config.api_token, stats))
+    scan.run("hardDrive70", stats, args, inventory, config,
+             lambda devices, journal: get_volumes_over_70_percent(inventory, devices, journal),
+             build_report, what="details")
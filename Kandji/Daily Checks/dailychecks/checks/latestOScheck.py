@@ -0,0 +1,162 @@
+"""
+Fetches the latest macOS and iOS versions from SOFA and reports devices that are
+behind via Slack.
+"""
+
+from datetime import datetime, timezone
+
+from . import CheckError
+from .. import metrics, slack
+from ..config import Config
+from ..delta import DeltaTracker, Entry, format_delta
+from ..inventory import Inventory
+from ..kandji import KandjiClient
+from ..records import loads
+
+# URLs to fetch the latest iOS and macOS versions
+ios_json_url = "https://sofafeed.macadmins.io/v1/ios_data_feed.json"
+macos_json_url = "https://sofafeed.macadmins.io/v1/macos_data_feed.json"
+
+# Function to read the latest version from a SOFA feed
+def latest_version_info(data):
+    latest_info = data['OSVersions'][0]['Latest']
+    latest_version = latest_info['ProductVersion']
+    latest_build = latest_info['Build']
+    latest_release_date = datetime.fromisoformat(latest_info['ReleaseDate'].replace("Z", "+00:00"))
+    formatted_release_date = latest_release_date.strftime('%B %d, %Y')
+    return latest_version, latest_build, formatted_release_date, latest_release_date
+
+# Function to get the latest versions from a JSON file
+def get_latest_versions_from_json(client, json_url):
+    response = client.request("GET", json_url)
+    response.raise_for_status()
+    with client.stats.timer("parse SOFA feed"):
+        return latest_version_info(loads(response.content))
+
+# Function to compare device OS versions with the latest versions
+def outdated_devices(devices, latest_ios_version, latest_macos_version):
+    from packaging import version
+
+    entries = []
+    outdated_counts = {}  # (platform, os_version, latest_version) -> devices
+    for device in devices:
+        # Skip devices with the "exclude_os_check" tag
+        if "exclude_os_check" in device.tags:
+            continue
+
+        os_version = (device.os_version or "").strip()
+        platform = (device.platform or "").lower()
+        device_name = device.device_name or "Unknown"
+        device_user = device.user or "Unknown User"
+
+        # Grouping iPad and iPhone under iOS, ignore AppleTV
+        if platform in ["ipad", "iphone"]:
+            latest_version = latest_ios_version
+            platform_name = "iPad" if platform == "ipad" else "iPhone"
+        elif platform == "mac":
+            latest_version = latest_macos_version
+            platform_name = "Mac"
+        else:
+            continue
+
+        # Compare versions and check if the device is outdated
+        if os_version and version.parse(os_version) < version.parse(latest_version):
+            key = (platform_name, os_version, latest_version)
+            outdated_counts[key] = outdated_counts.get(key, 0) + 1
+            entries.append(Entry(
+                device.device_id, device_name, [os_version, latest_version],
+                f"{device_name} ({platform_name}, User: {device_user}): {os_version} (Latest: {latest_version})"
+            ))
+    return entries, outdated_counts
+
+def main(stats, args, inventory=None, config=None):
+    import requests
+
+    config = config or Config.from_env()
+    inventory = inventory or Inventory(KandjiClient(config.base_url, config.api_token, stats))
+    client = inventory.client
+
+    # Fetch the latest iOS and macOS versions
+    try:
+        with stats.timer("fetch latest versions"):
+            latest_ios_version, latest_ios_build, latest_ios_release_date, ios_release_datetime = get_latest_versions_from_json(client, ios_json_url)
+            latest_macos_version, latest_macos_build, latest_macos_release_date, macos_release_datetime = get_latest_versions_from_json(client, macos_json_url)
+    except requests.RequestException as e:
+        raise CheckError(f"Failed to fetch the latest OS versions from SOFA: {e}", 2)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise CheckError(f"Error parsing the SOFA feed: {e!r}", 2)
+
+    # Calculate days since release
+    current_date = datetime.now(timezone.utc)
+    ios_days_since_release = (current_date - ios_release_datetime).days
+    macos_days_since_release = (current_date - macos_release_datetime).days
+
+    print("Latest OS Versions:")
+    print("macOS:")
+    print(f"  Version: {latest_macos_version}")
+    print(f"  Build: {latest_macos_build}")
+    print(f"  Release Date: {latest_macos_release_date}")
+    print(f"  Days Since Release: {macos_days_since_release}")
+
+
+    print("iOS:")
+    print(f"  Version: {latest_ios_version}")
+    print(f"  Build: {latest_ios_build}")
+    print(f"  Release Date: {latest_ios_release_date}")
+    print(f"  Days Since Release: {ios_days_since_release}")
+
+
+    # Making the API request with the API key in headers for authentication
+    try:
+        with stats.timer("fetch devices"):
+            devices = inventory.devices()
+    except requests.RequestException as e:
+        raise CheckError(f"Failed to fetch devices: {e}", 2)
+    except ValueError as e:
+        raise CheckError(f"Error parsing JSON response: {e}", 2)
+
+    # Compare device OS versions with the latest versions and prepare the message
+    with stats.timer("compare versions"):
+        entries, outdated_counts = outdated_devices(devices, latest_ios_version, latest_macos_version)
+
+    # Export outdated OS counts for the fleet exporter
+    with stats.timer("write metrics"):
+        metrics.write_snapshot("latestOScheck", [
+            metrics.gauge("kandji_outdated_os_devices", "Devices not running the latest OS, by installed version.",
+                          [({"platform": platform_name, "os_version": os_version, "latest_version": latest_version}, count)
+                           for (platform_name, os_version, latest_version), count in sorted(outdated_counts.items())]),
+            metrics.gauge("kandji_latest_os_days_since_release", "Days since the latest OS version was released.",
+                          [({"os": "macOS", "version": latest_macos_version}, macos_days_since_release),
+                           ({"os": "iOS", "version": latest_ios_version}, ios_days_since_release)]),
+        ], args.state_dir)
+
+    # Prepare the message for Slack
+    message = (
+        "Latest OS Versions:\n"
+        f"macOS:\n  Version: {latest_macos_version}\n  Build: {latest_macos_build}\n  Release Date: {latest_macos_release_date}\n"
+        f"  Days Since Release: {macos_days_since_release}\n"
+        ""
+        f"iOS:\n  Version: {latest_ios_version}\n  Build: {latest_ios_build}\n  Release Date: {latest_ios_release_date}\n"
+        f"  Days Since Release: {ios_days_since_release}\n"
+        ""
+        "Devices not running the latest OS:\n"
+    )
+
+    tracker = None
+    if args.delta:
+        tracker = DeltaTracker("latestOScheck", args.state_dir)
+        message = format_delta(message, tracker.compare(entries))
+    elif entries:
+        message += "\n".join(entry.line for entry in entries)
+    else:
+        message += "All devices are up to date with the latest OS versions."
+
+    # Send the message to Slack
+    if message is None:
+        print("No changes since the last run, nothing posted to Slack.")
+    else:
+        with stats.timer("send to slack"):
+            if not slack.send(client, config, message):
+                raise CheckError("Could not post the report to Slack.", 3)
+    if tracker:
+        tracker.save()
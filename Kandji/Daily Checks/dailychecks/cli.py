@@ -0,0 +1,36 @@
+"""
+Command line options shared by the Daily Checks. Per-device scans
+(resumable=True) also get the checkpoint journal and sharding options.
+"""
+
+import argparse
+import sys
+
+from . import delta, instrumentation, journal, shard
+
+
+def parse_args(description, argv=None, resumable=False, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    instrumentation.add_arguments(parser)
+    delta.add_arguments(parser)
+    if resumable:
+        journal.add_arguments(parser)
+        shard.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def run_check(name, argv=None, prog=None):
+    """
+    Parses the options of a check and runs it. The check module is imported
+    after the options are parsed, so --help and usage errors return right away.
+    A CheckError is printed and ends the process with its exit status.
+    """
+    from .checks import CHECKS, CheckError, load
+
+    description, resumable = CHECKS[name]
+    args = parse_args(description, argv, resumable, prog)
+    try:
+        return instrumentation.run(load(name).main, name, args)
+    except CheckError as e:
+        print(e)
+        sys.exit(e.status)
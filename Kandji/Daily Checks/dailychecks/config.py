@@ -0,0 +1,24 @@
+"""
+Kandji and Slack settings for the Daily Checks, read from the environment
+(GitHub Secrets on Actions) when a check runs rather than when it is imported.
+"""
+
+import os
+from collections import namedtuple
+
+ENVIRONMENT = {
+    "api_token": "DEVICE_CHECK_24",
+    "base_url": "KANDJI_BASE_URL",
+    "slack_channel": "KANDJI_NOTIFICATIONS_ID",
+    "slack_webhook_url": "KANDJI_NOTIFICATIONS_WEBHOOK",
+}
+
+
+class Config(namedtuple("Config", list(ENVIRONMENT))):
+    @classmethod
+    def from_env(cls):
+        return cls(**{field: os.getenv(var) for field, var in ENVIRONMENT.items()})
+
+    def missing(self):
+        """Names of the environment variables that are not set."""
+        return [var for field, var in ENVIRONMENT.items() if not getattr(self, field)]
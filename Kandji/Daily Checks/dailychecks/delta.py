@@ -0,0 +1,101 @@
+"""
+Delta reporting for the Daily Checks.
+
+A check hands its results to a DeltaTracker as (key, label, fields, line)
+entries. The tracker stores a compact fingerprint of each entry's key fields
+in a state file and compares them with the previous run, so only new, changed
+and resolved results need to be posted.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+DEFAULT_STATE_DIR = os.path.expanduser("~/.kandji-checks")
+
+Entry = namedtuple("Entry", ["key", "label", "fields", "line"])
+Delta = namedtuple("Delta", ["new", "changed", "resolved", "unchanged"])
+
+
+def state_dir(path=None):
+    return path or os.getenv("KANDJI_CHECKS_STATE_DIR") or DEFAULT_STATE_DIR
+
+
+def add_arguments(parser):
+    parser.add_argument("--delta", action="store_true", help="only post results that changed since the previous run")
+    parser.add_argument("--state-dir", metavar="DIR", help=f"where run state is kept (default: $KANDJI_CHECKS_STATE_DIR or {DEFAULT_STATE_DIR})")
+
+
+def fingerprint(fields):
+    data = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()[:16]
+
+
+class DeltaTracker:
+    def __init__(self, name, directory=None):
+        self.path = os.path.join(state_dir(directory), f"{name}.json")
+        self.previous = self.load()
+        self.current = {}
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f).get("results", {})
+        except (OSError, ValueError):
+            return {}
+
+    def device_keys(self, device_ids):
+        """Previous result keys of the given devices. Keys are the device ID, optionally followed by ':' and a sub-key."""
+        return [key for key in self.previous if key.split(":", 1)[0] in device_ids]
+
+    def compare(self, entries, unchecked=()):
+        """
+        Returns a Delta of entries (new, changed), labels (resolved) and a count
+        (unchanged). Previous results under the keys in unchecked, such as those
+        of devices that could not be queried this run, are carried forward
+        rather than reported as resolved.
+        """
+        new, changed = [], []
+        unchanged = 0
+        self.current = {}
+        for entry in entries:
+            fp = fingerprint(entry.fields)
+            self.current[entry.key] = [fp, entry.label]
+            previous = self.previous.get(entry.key)
+            if previous is None:
+                new.append(entry)
+            elif previous[0] != fp:
+                changed.append(entry)
+            else:
+                unchanged += 1
+        for key in unchecked:
+            if key in self.previous and key not in self.current:
+                self.current[key] = self.previous[key]
+        resolved = [label for key, (_, label) in self.previous.items() if key not in self.current]
+        return Delta(new, changed, resolved, unchanged)
+
+    def save(self):
+        """Stores the fingerprints from the last compare(). Call once the report has been posted."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated": datetime.now(timezone.utc).isoformat(), "results": self.current}, f)
+        os.replace(tmp_path, self.path)
+
+
+def format_delta(title, delta):
+    """Builds the Slack message for a delta, or None when nothing changed."""
+    if not (delta.new or delta.changed or delta.resolved):
+        return None
+    message = (f"{title}\n"
+               f"Since the last run: {len(delta.new)} new, {len(delta.changed)} changed, "
+               f"{len(delta.resolved)} resolved, {delta.unchanged} unchanged.\n")
+    if delta.new:
+        message += "\nNew:\n" + "\n".join(entry.line for entry in delta.new) + "\n"
+    if delta.changed:
+        message += "\nChanged:\n" + "\n".join(entry.line for entry in delta.changed) + "\n"
+    if delta.resolved:
+        message += "\nResolved:\n" + "\n".join(delta.resolved) + "\n"
+    return message
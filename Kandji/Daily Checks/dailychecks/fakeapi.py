@@ -0,0 +1,128 @@
+"""
+A fake Kandji API for trying the Daily Checks locally, for example a sharded
+scan with several worker processes:
+
+    python3 -m dailychecks.fakeapi --devices 500 --port 8765
+
+It serves a generated device list, paged like Kandji's with limit (at most
+300) and offset, plus /status and /details for every device, and prints the
+text of anything posted to /slack, so point KANDJI_BASE_URL at
+http://127.0.0.1:8765 and KANDJI_NOTIFICATIONS_WEBHOOK at .../slack. Every
+fourth device reports a library item error and disk usage climbs with the
+device number.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_PAGE = 300  # Kandji's limit on devices per request
+DEVICE_PATH = re.compile(r"^/api/v1/devices/device-(\d+)/(status|details)$")
+
+
+def make_devices(count):
+    now = datetime.now(timezone.utc)
+    return [{
+        "device_id": f"device-{i}",
+        "device_name": f"Mac {i}",
+        "serial_number": f"C02FAKE{i:05d}",
+        "platform": "Mac" if i % 3 else "iPhone",
+        "os_version": "14.1" if i % 2 else "15.0",
+        "tags": ["exclude_24"] if i % 10 == 9 else [],
+        "user": {"name": f"User {i}", "email": f"user{i}@example.com"},
+        "last_check_in": (now - timedelta(hours=i % 72)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    } for i in range(count)]
+
+
+def device_status(i):
+    return {"library_items": [
+        {"name": "Google Chrome", "status": "ERROR" if i % 4 == 0 else "PASS",
+         "log": "Installation failed\nExit code 1\nSee install.log"},
+        {"name": "Zoom", "status": "PASS", "log": ""},
+    ]}
+
+
+def device_details(i):
+    return {
+        "general": {"device_name": f"Mac {i}", "assigned_user": {"name": f"User {i}"}},
+        "hardware_overview": {"serial_number": f"C02FAKE{i:05d}"},
+        "volumes": [{"name": "Macintosh HD", "capacity": "494.38 GB", "available": "120.4 GB",
+                     "percent_used": f"{40 + i * 7 % 60}%"}],
+    }
+
+
+class FakeKandji(BaseHTTPRequestHandler):
+    devices = []
+    latency = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            type(self).requests += 1
+        time.sleep(self.latency)
+        url = urlsplit(self.path)
+        path = url.path
+        if path == "/api/v1/devices":
+            query = parse_qs(url.query)
+            try:
+                limit = min(int(query.get("limit", [MAX_PAGE])[0]), MAX_PAGE)
+                offset = int(query.get("offset", [0])[0])
+            except ValueError:
+                return self.send_json(400, {"error": "invalid limit or offset"})
+            return self.send_json(200, self.devices[offset:offset + limit])
+        match = DEVICE_PATH.match(path)
+        if match and int(match.group(1)) < len(self.devices):
+            i = int(match.group(1))
+            return self.send_json(200, device_status(i) if match.group(2) == "status" else device_details(i))
+        self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            text = json.loads(body).get("text", "")
+        except ValueError:
+            text = body.decode(errors="replace")
+        print(f"--- Slack message ({self.requests} API requests so far) ---\n{text}", flush=True)
+        self.send_json(200, {"ok": True})
+
+    def send_json(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serves a fake Kandji API for local testing.")
+    parser.add_argument("--host", default="127.0.0.1", help="listen address (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="listen port (default 8765)")
+    parser.add_argument("--devices", type=int, default=100, help="number of devices (default 100)")
+    parser.add_argument("--latency", metavar="SECONDS", type=float, default=0.0,
+                        help="delay added to every API response")
+    args = parser.parse_args(argv)
+
+    FakeKandji.devices = make_devices(args.devices)
+    FakeKandji.latency = args.latency
+    server = ThreadingHTTPServer((args.host, args.port), FakeKandji)
+    print(f"Fake Kandji API with {args.devices} devices on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
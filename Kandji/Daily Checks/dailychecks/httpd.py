@@ -0,0 +1,36 @@
+"""
+HTTP endpoints of the long-running Daily Checks tools: Prometheus metrics for
+fleetExporter.py, and the base handler the daemon and the check-in monitor
+extend with their own paths.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .metrics import CONTENT_TYPE
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    cache = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics" and self.cache is not None:
+            self.send_body(200, CONTENT_TYPE, self.cache.render())
+        else:
+            self.send_body(404, "text/plain", "Not found\n")
+
+    def send_body(self, code, content_type, body):
+        data = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the check output
+
+
+def make_server(host, port, handler, **attributes):
+    """Builds a threading HTTP server whose handler class carries the given attributes."""
+    bound = type(handler.__name__, (handler,), attributes)
+    return ThreadingHTTPServer((host, port), bound)
@@ -0,0 +1,118 @@
+"""
+Measures how long the Daily Checks take to import, so cold start on CI runners
+and on the Macs can be tracked over time:
+
+    python3 -m dailychecks.importtime
+    python3 -m dailychecks.importtime --repeat 9 --json importtime.json --budget 50
+
+Every module is imported in a fresh interpreter under `python -X importtime`,
+which reports the cumulative import time of each module. The median over
+--repeat runs is reported for each module, together with its heaviest direct
+imports, and the wall time of `python3 -m dailychecks CHECK --help` next to
+that of an interpreter that does nothing, to separate interpreter startup from
+our own. With --budget the command exits with status 1 when a module takes
+longer than that many milliseconds to import.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from .checks import CHECKS
+
+MODULES = ["dailychecks.cli"] + [f"dailychecks.checks.{name}" for name in CHECKS]
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(module, python=sys.executable):
+    """Runs one import under -X importtime and returns [(depth, name, self_us, cumulative_us)]."""
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((len(indent) // 2, name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def direct_imports(rows, module):
+    """The modules the given top-level module imported itself, with their cumulative times."""
+    index = max(i for i, row in enumerate(rows) if row[0] == 0 and row[1] == module)
+    children = []
+    for depth, name, _, cumulative_us in reversed(rows[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative_us))
+    return sorted(children, key=lambda child: child[1], reverse=True)
+
+
+def measure(module, repeat=5, python=sys.executable):
+    totals = []
+    heaviest = []
+    for _ in range(repeat):
+        rows = importtime(module, python)
+        totals.append(next(row[3] for row in reversed(rows) if row[0] == 0 and row[1] == module))
+        heaviest = direct_imports(rows, module)
+    return {"module": module, "import_ms": round(statistics.median(totals) / 1000, 1),
+            "heaviest": [[name, round(us / 1000, 1)] for name, us in heaviest[:5]]}
+
+
+def startup(arguments, repeat=5, python=sys.executable):
+    """Median wall time in milliseconds of running python with the given arguments."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([python] + arguments, cwd=PACKAGE_DIR, capture_output=True, check=True)
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m dailychecks.importtime",
+                                     description="Measures the import time of the Daily Checks.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the median is reported (default 5)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--budget", metavar="MS", type=float, help="exit with status 1 if a module imports slower than MS")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "modules": [measure(module, args.repeat) for module in MODULES],
+        "interpreter_ms": startup(["-c", "pass"], args.repeat),
+        "help_ms": {name: startup(["-m", "dailychecks", name, "--help"], args.repeat) for name in CHECKS},
+    }
+
+    for entry in results["modules"]:
+        heaviest = ", ".join(f"{name} {ms}" for name, ms in entry["heaviest"][:3])
+        print(f"{entry['module']:<48}{entry['import_ms']:>8.1f} ms   ({heaviest})")
+    print(f"{'python3 -c pass':<48}{results['interpreter_ms']:>8.1f} ms")
+    for name, ms in results["help_ms"].items():
+        print(f"{'python3 -m dailychecks ' + name + ' --help':<48}{ms:>8.1f} ms")
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.budget is not None:
+        over = [entry["module"] for entry in results["modules"] if entry["import_ms"] > args.budget]
+        if over:
+            print(f"Over the {args.budget:g} ms import budget: {', '.join(over)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Timers, request accounting and profiling for the Daily Checks.
+
+Every check records its HTTP calls and stage timings in a RunStats object. The
+command line switches added by add_arguments write a cProfile dump and a JSON
+run summary, and keep debug dumps of API payloads off unless asked for.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class RunStats:
+    """Collects request and stage timings for a single check run."""
+
+    def __init__(self, name, debug=False):
+        self.name = name
+        self.debug_enabled = debug
+        self.started = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.stages = {}  # Stage name -> [count, total seconds]
+        self.requests = []  # (method, status, bytes on the wire, seconds, decoded bytes)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def record_request(self, method, status, size, elapsed, decoded_size=None):
+        self.requests.append((method, status, size, elapsed, size if decoded_size is None else decoded_size))
+
+    def debug(self, message, *args):
+        """Prints message % args with --debug. The arguments are only formatted when debug is on."""
+        if self.debug_enabled:
+            print(message % args if args else message)
+
+    def summary(self):
+        latencies = sorted(elapsed * 1000 for _, _, _, elapsed, _ in self.requests)
+        by_status = {}
+        for _, status, _, _, _ in self.requests:
+            key = str(status) if status is not None else "error"
+            by_status[key] = by_status.get(key, 0) + 1
+        return {
+            "check": self.name,
+            "started": self.started.isoformat(),
+            "duration_seconds": round(time.perf_counter() - self.start_time, 3),
+            "requests": {
+                "count": len(self.requests),
+                "bytes": sum(size for _, _, size, _, _ in self.requests),
+                "decoded_bytes": sum(decoded_size for _, _, _, _, decoded_size in self.requests),
+                "by_status": by_status,
+                "latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p90": percentile(latencies, 90),
+                    "p99": percentile(latencies, 99),
+                    "max": round(latencies[-1], 1) if latencies else None,
+                },
+            },
+            "stages": {
+                stage: {"count": count, "total_seconds": round(total, 3)}
+                for stage, (count, total) in self.stages.items()
+            },
+        }
+
+    def write_summary(self, path):
+        data = json.dumps(self.summary(), indent=2)
+        if path == "-":
+            print(data)
+        else:
+            with open(path, "w") as f:
+                f.write(data + "\n")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, int(round(pct / 100 * len(sorted_values))) - 1)
+    return round(sorted_values[min(rank, len(sorted_values) - 1)], 1)
+
+
+def add_arguments(parser):
+    parser.add_argument("--profile", metavar="PATH", help="write cProfile stats for the run to PATH")
+    parser.add_argument("--summary", metavar="PATH", help="write a JSON run summary to PATH ('-' for stdout)")
+    parser.add_argument("--debug", action="store_true", help="print full API payloads while running")
+
+
+def run(check, name, args):
+    """
+    Calls check(stats, args), under cProfile when --profile is set, and writes the run
+    summary afterwards even if the check exits early.
+    """
+    stats = RunStats(name, debug=args.debug)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    try:
+        if profiler:
+            profiler.enable()
+        return check(stats, args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            import pstats
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+        if args.summary:
+            stats.write_summary(args.summary)
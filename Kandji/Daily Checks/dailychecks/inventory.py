@@ -0,0 +1,114 @@
+"""
+Device inventory shared by the Daily Checks.
+
+The device list is fetched once and reused until it is older than max_age.
+Per-device /details and /status responses are cached as well and only fetched
+again when the device has checked in since, or when the cached copy is older
+than detail_max_age. A one-shot script uses a fresh Inventory per run, while
+the daemon keeps one alive so later runs only refresh what changed.
+
+Devices and /details responses are kept as the compact records from
+records.py rather than the full API payloads. With --debug the payloads are
+printed as they are fetched, before they are reduced.
+"""
+
+import threading
+import time
+
+from .records import Device, loads
+
+PAGE_SIZE = 300  # Kandji returns at most 300 devices per request
+
+
+class Inventory:
+    def __init__(self, client, max_age=300, detail_max_age=6 * 60 * 60):
+        self.client = client
+        self.max_age = max_age
+        self.detail_max_age = detail_max_age
+        self.fetched = None
+        self.by_id = {}
+        self.device_list = []
+        self.cache = {}  # (device_id, kind) -> (last_check_in, fetched, data)
+        self.lock = threading.Lock()
+
+    def devices(self):
+        """Returns the device list, refreshing it if it is older than max_age."""
+        with self.lock:
+            if self.fetched is None or time.monotonic() - self.fetched > self.max_age:
+                self.refresh()
+            return self.device_list
+
+    def refresh(self):
+        import requests
+
+        # Page through the device list; a short page is the last one
+        by_id = {}
+        offset = 0
+        while True:
+            response = self.client.get(f"/api/v1/devices?limit={PAGE_SIZE}&offset={offset}")
+            response.raise_for_status()
+            with self.client.stats.timer("parse devices"):
+                try:
+                    data = loads(response.content)
+                except ValueError as e:
+                    raise requests.exceptions.InvalidJSONError(f"Invalid device list: {e}", response=response)
+                if not isinstance(data, list):
+                    raise requests.exceptions.InvalidJSONError("Invalid device list: expected a list", response=response)
+                self.client.stats.debug("Devices response (offset %d): %s", offset, data)
+                for device in data:
+                    if isinstance(device, dict):
+                        record = Device.from_json(device)
+                        by_id[record.device_id] = record
+            if len(data) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+        # Devices that moved between pages while paging are only listed once
+        devices = list(by_id.values())
+
+        # Drop cached per-device data for devices that checked in or went away
+        changed = 0
+        for key in list(self.cache):
+            device = by_id.get(key[0])
+            if device is None or device.last_check_in != self.cache[key][0]:
+                del self.cache[key]
+                changed += 1
+        if self.fetched is not None:
+            print(f"Inventory refreshed: {len(devices)} devices, {changed} cached entries invalidated.")
+
+        self.device_list = devices
+        self.by_id = by_id
+        self.fetched = time.monotonic()
+
+    def device_details(self, device_id):
+        """The device's /details response as a Device record with its volumes."""
+        return self.device_json(device_id, "details", lambda data: Device.from_details(device_id, data))
+
+    def device_status(self, device_id):
+        return self.device_json(device_id, "status")
+
+    def device_json(self, device_id, kind, parse=None):
+        """
+        Returns the parsed /api/v1/devices/<id>/<kind> response, passed through
+        parse when given, or None if the request failed.
+        """
+        import requests
+
+        device = self.by_id.get(device_id)
+        last_check_in = device.last_check_in if device else None
+        cached = self.cache.get((device_id, kind))
+        if cached and cached[0] == last_check_in and time.monotonic() - cached[1] < self.detail_max_age:
+            return cached[2]
+        try:
+            response = self.client.get(f"/api/v1/devices/{device_id}/{kind}")
+            response.raise_for_status()
+            with self.client.stats.timer(f"parse device {kind}"):
+                data = loads(response.content)
+                # Dumped before parse reduces the payload to a record
+                self.client.stats.debug("Device %s for %s: %s", kind, device_id, data)
+                if parse:
+                    data = parse(data)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error fetching device {kind} for {device_id}: {e}")
+            return None
+        self.cache[(device_id, kind)] = (last_check_in, time.monotonic(), data)
+        return data
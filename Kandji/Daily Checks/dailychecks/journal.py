@@ -0,0 +1,80 @@
+"""
+Checkpoint journal for per-device scans.
+
+Each processed device is appended to a JSON lines file in the state directory
+together with its partial results. If the scan dies partway, the next run
+reads the journal back, skips the devices already done and merges their
+results. The journal is removed as soon as the scan has finished, so a run
+whose report could not be posted scans again rather than reposting old results.
+Use it as a context manager so the file is closed however the scan ends.
+"""
+
+import json
+import os
+import time
+
+from .delta import state_dir
+
+MAX_AGE_SECONDS = 12 * 60 * 60  # Older journals are from a previous day's scan
+
+
+def add_arguments(parser):
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="ignore the checkpoint journal of an interrupted run and scan every device")
+
+
+class ScanJournal:
+    def __init__(self, name, directory=None, resume=True):
+        self.path = os.path.join(state_dir(directory), f"{name}.journal")
+        self.done = self.load() if resume else {}
+        if not self.done:
+            self.start()
+        self.file = open(self.path, "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def load(self):
+        """Returns {device_id: results} from an unfinished recent run."""
+        done = {}
+        try:
+            with open(self.path) as f:
+                header = json.loads(f.readline())
+                if time.time() - header.get("started", 0) > MAX_AGE_SECONDS:
+                    return {}
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Last line was cut off when the run died
+                    done[record["device_id"]] = record["results"]
+        except (OSError, ValueError, KeyError):
+            return {}
+        if done:
+            print(f"Resuming scan, {len(done)} devices already processed.")
+        return done
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"started": time.time()}) + "\n")
+
+    def record(self, device_id, results):
+        self.done[device_id] = results
+        self.file.write(json.dumps({"device_id": device_id, "results": results}) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def complete(self):
+        """Removes the journal once every device has been scanned."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,101 @@
+"""
+Kandji API access for the Daily Checks. Every request made through the client
+is timed and counted in the run's RunStats.
+
+Kandji API calls can be limited to rate_limit requests per second (or
+$KANDJI_RATE_LIMIT), and responses with HTTP 429 are retried after the
+Retry-After delay the API asks for. Responses are requested gzip-compressed,
+or brotli-compressed when a brotli decoder is installed for urllib3.
+
+requests is imported when the first client is created, so importing this
+module stays cheap for code that never talks to the API.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+
+from .instrumentation import RunStats
+
+MAX_RETRIES = 3
+
+
+def accept_encoding():
+    # urllib3 decodes br responses only when a brotli package is installed
+    if any(importlib.util.find_spec(name) for name in ("brotli", "brotlicffi")):
+        return "br, gzip, deflate"
+    return "gzip, deflate"
+
+
+def wire_size(response, decoded_size):
+    """
+    Size of the response body as sent, before gzip or brotli decoding: the
+    Content-Length, else what urllib3 read from the socket. Compressed bodies
+    sent chunked without a length fall back to the decoded size.
+    """
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        pass
+    raw_size = getattr(response.raw, "tell", lambda: 0)()
+    return raw_size or decoded_size
+
+
+class KandjiClient:
+    def __init__(self, base_url, api_token, stats=None, rate_limit=None):
+        self.base_url = (base_url or "").rstrip("/")
+        self.headers = {"Authorization": f"Bearer {api_token}"}
+        self.stats = stats or RunStats("kandji")
+        import requests
+
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = accept_encoding()
+        if rate_limit is None:
+            rate_limit = float(os.getenv("KANDJI_RATE_LIMIT") or 0)
+        self.rate_limit = rate_limit
+        self.next_request = 0.0
+        self.rate_lock = threading.Lock()
+
+    def throttle(self):
+        """Spaces Kandji API calls so they stay under rate_limit per second."""
+        if self.rate_limit <= 0:
+            return
+        with self.rate_lock:
+            now = time.monotonic()
+            wait = self.next_request - now
+            self.next_request = max(now, self.next_request) + 1 / self.rate_limit
+        if wait > 0:
+            time.sleep(wait)
+
+    def request(self, method, url, **kwargs):
+        """Sends a request and records its status, wire and decoded sizes and latency."""
+        start = time.perf_counter()
+        status = None
+        size = decoded_size = 0
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            decoded_size = len(response.content)
+            size = wire_size(response, decoded_size)
+            return response
+        finally:
+            self.stats.record_request(method, status, size, time.perf_counter() - start, decoded_size)
+
+    def get(self, path, **kwargs):
+        """GET a Kandji API path such as /api/v1/devices with the API token."""
+        headers = dict(self.headers, **kwargs.pop("headers", {}))
+        for attempt in range(MAX_RETRIES + 1):
+            self.throttle()
+            response = self.request("GET", f"{self.base_url}{path}", headers=headers, **kwargs)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                delay = 1.0
+            time.sleep(min(delay, 60))
+
+    def post(self, url, **kwargs):
+        """POST to an arbitrary URL, e.g. a Slack webhook, without the API token."""
+        return self.request("POST", url, **kwargs)
@@ -0,0 +1,116 @@
+"""
+Prometheus/OpenMetrics snapshots of what the Daily Checks compute.
+
+Each check writes its metric families to a JSON snapshot in the state
+directory at the end of a run. SnapshotCache renders all snapshots in the
+Prometheus text format and only re-reads them when a file changed, so a
+scrape costs a few stat() calls and never reaches the Kandji API. The HTTP
+side lives in httpd.py, so the checks do not import http.server.
+"""
+
+import json
+import os
+import threading
+import time
+
+from .delta import state_dir
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STALENESS_BUCKETS_HOURS = [1, 6, 12, 24, 48, 72, 168, 720]
+
+
+def snapshot_dir(directory=None):
+    return os.path.join(state_dir(directory), "metrics")
+
+
+def gauge(name, help_text, samples):
+    """samples is a list of (labels dict, value)."""
+    return {"name": name, "type": "gauge", "help": help_text,
+            "samples": [[name, labels, value] for labels, value in samples]}
+
+
+def histogram(name, help_text, buckets, values, labels=None):
+    labels = labels or {}
+    samples = []
+    for bound in buckets:
+        samples.append([f"{name}_bucket", dict(labels, le=str(bound)), sum(1 for v in values if v <= bound)])
+    samples.append([f"{name}_bucket", dict(labels, le="+Inf"), len(values)])
+    samples.append([f"{name}_sum", labels, round(sum(values), 3)])
+    samples.append([f"{name}_count", labels, len(values)])
+    return {"name": name, "type": "histogram", "help": help_text, "samples": samples}
+
+
+def write_snapshot(check, families, directory=None):
+    path = os.path.join(snapshot_dir(directory), f"{check}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"check": check, "updated": time.time(), "families": families}, f)
+    os.replace(tmp_path, path)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_sample(name, labels, value):
+    if labels:
+        label_text = ",".join(f'{key}="{escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+def render(snapshots):
+    lines = []
+    updated = []
+    for snapshot in snapshots:
+        updated.append(({"check": snapshot["check"]}, snapshot["updated"]))
+        for family in snapshot["families"]:
+            lines.append(f"# HELP {family['name']} {family['help']}")
+            lines.append(f"# TYPE {family['name']} {family['type']}")
+            lines.extend(format_sample(*sample) for sample in family["samples"])
+    family = gauge("kandji_check_snapshot_timestamp_seconds", "When the check last wrote its metrics.", updated)
+    lines.append(f"# HELP {family['name']} {family['help']}")
+    lines.append(f"# TYPE {family['name']} {family['type']}")
+    lines.extend(format_sample(*sample) for sample in family["samples"])
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotCache:
+    """Serves the rendered snapshots, re-reading them only when they change."""
+
+    def __init__(self, directory=None):
+        self.directory = snapshot_dir(directory)
+        self.key = None
+        self.text = render([])
+        self.lock = threading.Lock()
+
+    def files(self):
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((path, stat.st_mtime_ns, stat.st_size))
+        return files
+
+    def render(self):
+        with self.lock:
+            files = self.files()
+            if files != self.key:
+                snapshots = []
+                for path, _, _ in files:
+                    try:
+                        with open(path) as f:
+                            snapshots.append(json.load(f))
+                    except (OSError, ValueError):
+                        continue
+                self.text = render(snapshots)
+                self.key = files
+            return self.text
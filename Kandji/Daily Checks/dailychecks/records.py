@@ -0,0 +1,135 @@
+"""
+Compact records for the Kandji payloads the Daily Checks read.
+
+The device list and /details responses carry far more than the checks use.
+They are decoded with orjson or msgspec when one is installed (falling back to
+the standard json module, and only looked up on first use) and then reduced to __slots__ records that keep only
+the fields the checks read, so an inventory of thousands of devices stays small
+in the daemon.
+"""
+
+import json
+import sys
+
+_decode = None  # Picked on the first loads() call so importing a check stays cheap
+
+
+def decoder():
+    """orjson.loads or msgspec's decoder when one is installed, else json.loads."""
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+    except ImportError:
+        return json.loads
+
+    def decode(data):
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return decode
+
+
+def loads(data):
+    global _decode
+    if _decode is None:
+        _decode = decoder()
+    return _decode(data)
+
+
+def intern(value):
+    """Shares repeated strings such as platforms, OS versions and tags between records."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def user_name(value):
+    """The device list reports the user as a name or a {name, email, ...} object."""
+    if isinstance(value, dict):
+        return value.get("name")
+    return value if isinstance(value, str) else None
+
+
+class Record:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class Volume(Record):
+    __slots__ = ("name", "capacity", "available", "percent_used")
+
+    def __init__(self, name=None, capacity=None, available=None, percent_used=None):
+        self.name = name
+        self.capacity = capacity
+        self.available = available
+        self.percent_used = percent_used
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get("name"), data.get("capacity"), data.get("available"), data.get("percent_used"))
+
+
+class Device(Record):
+    __slots__ = ("device_id", "device_name", "serial_number", "tags", "platform",
+                 "os_version", "last_check_in", "user", "volumes")
+
+    def __init__(self, device_id, device_name=None, serial_number=None, tags=(), platform=None,
+                 os_version=None, last_check_in=None, user=None, volumes=()):
+        self.device_id = device_id
+        self.device_name = device_name
+        self.serial_number = serial_number
+        self.tags = tags
+        self.platform = platform
+        self.os_version = os_version
+        self.last_check_in = last_check_in
+        self.user = user
+        self.volumes = volumes
+
+    @classmethod
+    def from_json(cls, data):
+        """Builds a record from an /api/v1/devices list entry."""
+        return cls(
+            data.get("device_id"),
+            data.get("device_name"),
+            data.get("serial_number"),
+            tuple(intern(tag) for tag in data.get("tags") or ()),
+            intern(data.get("platform")),
+            intern(data.get("os_version")),
+            data.get("last_check_in"),
+            user_name(data.get("user")),
+        )
+
+    @classmethod
+    def from_details(cls, device_id, data):
+        """Builds a record from an /api/v1/devices/<id>/details response."""
+        data = data if isinstance(data, dict) else {}
+        general = data.get("general")
+        general = general if isinstance(general, dict) else {}
+        hardware = data.get("hardware_overview")
+        hardware = hardware if isinstance(hardware, dict) else {}
+        volumes = data.get("volumes")
+        return cls(
+            device_id,
+            general.get("device_name"),
+            hardware.get("serial_number"),
+            tuple(intern(tag) for tag in data.get("tags") or ()),
+            intern(general.get("platform")),
+            intern(general.get("os_version")),
+            general.get("last_check_in"),
+            user_name(general.get("assigned_user")),
+            tuple(Volume.from_json(volume) for volume in volumes if isinstance(volume, dict))
+            if isinstance(volumes, list) else (),
+        )
@@ -0,0 +1,88 @@
+"""
+The per-device scan shared by errorCheck.py and hardDrive70.py.
+
+A scan fetches the device list, queries every device under a checkpoint
+journal, and then either hands its results to the merge step (--shard) or
+builds the report, writes the metrics snapshot, applies --delta and posts to
+Slack. With --merge the results come from the shard workers instead.
+
+Results map each device ID to the check's result for that device, or to None
+when the device could not be queried. Those devices keep their previous delta
+results and hold back the metrics snapshot, since a partial scan would
+undercount.
+"""
+
+from collections import namedtuple
+
+from . import metrics, shard, slack
+from .checks import CheckError
+from .delta import DeltaTracker, format_delta
+from .journal import ScanJournal
+
+# entries: delta Entry list, families: metric families, title: delta message title,
+# message: the full report posted without --delta
+Report = namedtuple("Report", ["entries", "families", "title", "message"])
+
+
+def run(name, stats, args, inventory, config, scan_devices, build_report, what="data"):
+    """
+    Runs the check called name. scan_devices(devices, journal) returns the
+    results of the given devices, build_report(results) gets the results of the
+    devices that were queried and returns a Report. what names the per-device
+    request in messages, e.g. "status".
+    """
+    import requests
+
+    if args.merge:
+        # Build the report from the partial results of the shard workers
+        try:
+            with stats.timer("merge shards"):
+                results = shard.read_partials(name, args.merge, args.shard_dir, args.state_dir)
+        except shard.ShardError as e:
+            raise CheckError(f"Cannot merge shards: {e}", 1)
+    else:
+        try:
+            with stats.timer("fetch devices"):
+                devices = inventory.devices()
+        except requests.RequestException as e:
+            raise CheckError(f"Failed to fetch devices: {e}", 2)
+
+        with ScanJournal(shard.journal_name(name, args.shard), args.state_dir, resume=args.resume) as journal:
+            with stats.timer("scan devices"):
+                results = scan_devices(shard.select(devices, args.shard), journal)
+            journal.complete()
+
+        # Shard workers leave the report to the merge step
+        if args.shard:
+            path = shard.write_partial(name, args.shard, results, args.shard_dir, args.state_dir)
+            print(f"Wrote results for {len(results)} devices to {path}")
+            return
+
+    failed = {device_id for device_id, result in results.items() if result is None}
+    report = build_report({device_id: result for device_id, result in results.items() if result is not None})
+
+    if failed:
+        kept = ", keeping their previous results" if args.delta else ""
+        print(f"Could not fetch the {what} of {len(failed)} devices{kept}. The metrics snapshot is not updated.")
+    else:
+        with stats.timer("write metrics"):
+            metrics.write_snapshot(name, report.families, args.state_dir)
+
+    tracker = None
+    if args.delta:
+        tracker = DeltaTracker(name, args.state_dir)
+        message = format_delta(report.title, tracker.compare(report.entries, tracker.device_keys(failed)))
+    else:
+        message = report.message
+
+    # Send the message to Slack
+    if message is None:
+        print("No changes since the last run, nothing posted to Slack.")
+    else:
+        with stats.timer("send to slack"):
+            if not slack.send(inventory.client, config, message):
+                raise CheckError("Could not post the report to Slack.", 3)
+    if tracker:
+        tracker.save()
+    if args.merge:
+        shard.clear_partials(name, args.merge, args.shard_dir, args.state_dir)
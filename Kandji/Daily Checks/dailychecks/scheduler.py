@@ -0,0 +1,128 @@
+"""
+Scheduler and health endpoint for running the Daily Checks in one process.
+
+Checks run one at a time on the scheduler thread, so a slow run can never
+overlap the next run of the same check or fight another check for the shared
+connection pool. Each check is rescheduled relative to the start of its last
+run, plus random jitter so checks with the same interval do not fire together.
+"""
+
+import json
+import random
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+from .checks import CheckError
+from .instrumentation import RunStats
+from .httpd import MetricsHandler, make_server
+
+
+def isoformat(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class ScheduledCheck:
+    def __init__(self, name, run, interval, jitter=0, debug=False):
+        self.name = name
+        self.run = run  # Called with a fresh RunStats
+        self.interval = interval
+        self.jitter = jitter
+        self.debug = debug  # Print full API payloads during runs
+        self.next_run = time.time() + random.uniform(0, jitter)
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_start = None
+        self.last_duration = None
+        self.last_status = None
+        self.last_summary = None
+
+    def status(self):
+        return {
+            "interval_seconds": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_start": isoformat(self.last_start),
+            "last_duration_seconds": self.last_duration,
+            "last_status": self.last_status,
+            "next_run": isoformat(self.next_run),
+            "last_summary": self.last_summary,
+        }
+
+
+class Scheduler:
+    def __init__(self, checks):
+        self.checks = checks
+        self.started = time.time()
+        self.stop_event = threading.Event()
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def run_forever(self):
+        while not self.stop_event.is_set():
+            check = min(self.checks, key=lambda c: c.next_run)
+            delay = check.next_run - time.time()
+            if delay > 0:
+                # Wake up early when stopped; otherwise pick the next check again
+                self.stop_event.wait(delay)
+                continue
+            self.run_check(check)
+
+    def run_check(self, check):
+        print(f"Running {check.name}")
+        stats = RunStats(check.name, debug=check.debug)
+        check.running = True
+        check.last_start = time.time()
+        try:
+            check.run(stats)
+            check.last_status = "ok"
+        except CheckError as e:
+            print(e)
+            check.last_status = f"error: {e}"
+        except Exception as e:
+            traceback.print_exc()
+            check.last_status = f"error: {e}"
+        finally:
+            finished = time.time()
+            check.running = False
+            check.runs += 1
+            if check.last_status != "ok":
+                check.failures += 1
+            check.last_duration = round(finished - check.last_start, 3)
+            check.last_summary = stats.summary()
+            # A run that took longer than its interval starts again right away
+            check.next_run = max(finished, check.last_start + check.interval + random.uniform(0, check.jitter))
+        print(f"{check.name} finished in {check.last_duration}s: {check.last_status}")
+
+    def status(self):
+        return {
+            "started": isoformat(self.started),
+            "uptime_seconds": round(time.time() - self.started),
+            "checks": {check.name: check.status() for check in self.checks},
+        }
+
+
+class HealthHandler(MetricsHandler):
+    scheduler = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] in ("/", "/health"):
+            self.send_body(200, "application/json", json.dumps(self.scheduler.status(), indent=2))
+        else:
+            super().do_GET()
+
+
+def serve_health(scheduler, host="127.0.0.1", port=8787, cache=None):
+    """
+    Serves scheduler status on /health, and the metrics snapshots on /metrics
+    when a SnapshotCache is given, from a background thread.
+    """
+    server = make_server(host, port, HealthHandler, scheduler=scheduler, cache=cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
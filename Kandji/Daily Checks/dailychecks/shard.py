@@ -0,0 +1,125 @@
+"""
+Splits the per-device scans of errorCheck.py and hardDrive70.py across workers.
+
+With --shard I/N a worker only scans the devices whose ID hashes to shard I of
+N, writes its per-device results to <shard-dir>/<check>/I-of-N.json and posts
+nothing. A final run with --merge N reads all N partial results, builds the
+report and posts it to Slack, without calling the Kandji API for devices.
+
+Devices are assigned with a SHA-1 of the device ID rather than hash(), so every
+worker process agrees on the split no matter when or where it runs.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from .delta import state_dir
+from .journal import MAX_AGE_SECONDS
+
+
+class ShardError(Exception):
+    pass
+
+
+def parse_shard(value):
+    """Parses I/N, with shards numbered from 1 to N."""
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, expected I/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, I must be between 1 and N")
+    return index, count
+
+
+def parse_count(value):
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"invalid shard count {value!r}")
+    return count
+
+
+def add_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--shard", metavar="I/N", type=parse_shard,
+                       help="only scan shard I of N and write partial results instead of posting")
+    group.add_argument("--merge", metavar="N", type=parse_count,
+                       help="build and post the report from the partial results of N shards")
+    parser.add_argument("--shard-dir", metavar="DIR",
+                        help="shared directory for partial results (default: shards/ in the state directory)")
+
+
+def shard_of(device_id, count):
+    """The 1-based shard a device belongs to."""
+    digest = hashlib.sha1(str(device_id).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select(devices, shard):
+    """The devices in the given (I, N) shard, or all devices when shard is None."""
+    if shard is None:
+        return devices
+    index, count = shard
+    return [device for device in devices if shard_of(device.device_id, count) == index]
+
+
+def journal_name(check, shard):
+    """Workers get their own checkpoint journal so they can share a state directory."""
+    if shard is None:
+        return check
+    return f"{check}.shard-{shard[0]}-of-{shard[1]}"
+
+
+def partial_path(check, index, count, directory=None, state=None):
+    directory = directory or os.path.join(state_dir(state), "shards")
+    return os.path.join(directory, check, f"{index}-of-{count}.json")
+
+
+def write_partial(check, shard, results, directory=None, state=None):
+    """Writes one worker's {device_id: results} for the merge step."""
+    path = partial_path(check, *shard, directory, state)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"shard": list(shard), "written": time.time(), "results": results}, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_partials(check, count, directory=None, state=None):
+    """
+    Merges the partial results of all shards in shard order. Raises ShardError
+    if a shard is missing or its results are from an earlier day's scan.
+    """
+    merged = {}
+    missing = []
+    for index in range(1, count + 1):
+        try:
+            with open(partial_path(check, index, count, directory, state)) as f:
+                partial = json.load(f)
+        except (OSError, ValueError):
+            missing.append(str(index))
+            continue
+        if time.time() - partial.get("written", 0) > MAX_AGE_SECONDS:
+            missing.append(f"{index} (stale)")
+            continue
+        merged.update(partial["results"])
+    if missing:
+        raise ShardError(f"missing results for shard {', '.join(missing)} of {count}")
+    return merged
+
+
+def clear_partials(check, count, directory=None, state=None):
+    """Removes merged partial results so they cannot be merged into a later report."""
+    for index in range(1, count + 1):
+        try:
+            os.remove(partial_path(check, index, count, directory, state))
+        except OSError:
+            pass
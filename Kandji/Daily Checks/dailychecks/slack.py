@@ -0,0 +1,23 @@
+"""
+Slack notifications for the Daily Checks.
+"""
+
+
+def send(client, config, message):
+    """Posts message to the configured Slack webhook. Returns True if it was accepted."""
+    import requests
+
+    payload = {
+        "channel": config.slack_channel,
+        "text": message,
+        "username": "Device Monitor",  # Customize the bot's username
+        "icon_emoji": ":robot_face:"  # Customize the bot's icon
+    }
+    try:
+        response = client.post(config.slack_webhook_url, json=payload)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Error sending message to Slack: {e}")
+        return False
+    print("Message sent to Slack successfully.")
+    return True
@@ -0,0 +1,161 @@
+"""
+Event-driven tracking of devices that stop checking in.
+
+Every device has a deadline, last_check_in plus the threshold, kept in a
+min-heap. Updates come from inventory refreshes (only devices whose
+last_check_in changed are touched) or from webhook events. Between updates
+the monitor only has to look at the top of the heap to know the next device
+that goes stale, so a device is flagged within minutes of crossing the
+threshold instead of at the next daily run.
+
+Heap entries are never removed in place. A device that checks in gets a new
+entry, and the old one is skipped when it reaches the top because it no longer
+matches the device's current deadline.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+
+from .records import Device
+
+
+def parse_check_in(value):
+    """Parses a Kandji last_check_in timestamp into epoch seconds, or None."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.rstrip("Z"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class StalenessMonitor:
+    def __init__(self, threshold_hours=24, exclude_tag="exclude_24"):
+        self.threshold = threshold_hours * 60 * 60
+        self.exclude_tag = exclude_tag
+        self.devices = {}    # device_id -> Device
+        self.deadlines = {}  # device_id -> deadline of the device's live heap entry
+        self.heap = []       # (deadline, device_id)
+        self.stale = {}      # device_id -> Device, devices past their deadline
+        self.newly_stale = []
+        self.recovered = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()  # Set when an update may change what is due
+
+    def update(self, device):
+        """Adds or updates one device. Returns True if its deadline changed."""
+        with self.lock:
+            known = self.devices.get(device.device_id)
+            if known is not None and known.last_check_in != device.last_check_in:
+                known_check_in = parse_check_in(known.last_check_in)
+                checked_in = parse_check_in(device.last_check_in)
+                if known_check_in is not None and (checked_in is None or checked_in < known_check_in):
+                    # An older check-in, e.g. a device list fetched before a webhook event
+                    # arrived. Keep the newer one so the device does not flap stale.
+                    device = Device(**dict(device.to_dict(), last_check_in=known.last_check_in))
+            self.devices[device.device_id] = device
+            if known is not None and known.last_check_in == device.last_check_in and \
+                    (self.exclude_tag in known.tags) == (self.exclude_tag in device.tags):
+                return False
+            checked_in = parse_check_in(device.last_check_in)
+            if checked_in is None or self.exclude_tag in device.tags:
+                self.deadlines.pop(device.device_id, None)
+                self.stale.pop(device.device_id, None)
+                return True
+            deadline = checked_in + self.threshold
+            if device.device_id in self.stale:
+                if deadline <= time.time():
+                    return True  # Checked in, but still too long ago
+                del self.stale[device.device_id]
+                self.recovered.append(device)
+            self.deadlines[device.device_id] = deadline
+            heapq.heappush(self.heap, (deadline, device.device_id))
+        self.wake.set()
+        return True
+
+    def remove(self, device_id):
+        with self.lock:
+            self.devices.pop(device_id, None)
+            self.deadlines.pop(device_id, None)
+            self.stale.pop(device_id, None)
+
+    def sync(self, devices):
+        """Applies a full device list. Returns how many devices changed."""
+        seen = set()
+        changed = 0
+        for device in devices:
+            seen.add(device.device_id)
+            changed += self.update(device)
+        for device_id in set(self.devices) - seen:
+            self.remove(device_id)
+            changed += 1
+        return changed
+
+    def check_event(self, event):
+        """Raises ValueError if a webhook event cannot be applied."""
+        if not isinstance(event, dict):
+            raise ValueError("event is not an object")
+        device_id = event.get("device_id")
+        if not device_id or not isinstance(device_id, str):
+            raise ValueError("event has no device_id")
+        if event.get("event") in ("device.deleted", "device.removed"):
+            return
+        if "last_check_in" in event:
+            if parse_check_in(event["last_check_in"]) is None:
+                raise ValueError(f"device {device_id} has an invalid last_check_in")
+        elif device_id not in self.devices:
+            raise ValueError(f"unknown device {device_id} has no last_check_in")
+        tags = event.get("tags")
+        if tags is not None and not (isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+            raise ValueError(f"device {device_id} has invalid tags")
+
+    def apply_event(self, event):
+        """
+        Applies a webhook event: a device object with at least device_id, merged
+        into what is known about the device, or {"event": "device.deleted", ...}.
+        A device that is not tracked yet needs a last_check_in.
+        """
+        self.check_event(event)
+        device_id = event["device_id"]
+        if event.get("event") in ("device.deleted", "device.removed"):
+            self.remove(device_id)
+            return
+        known = self.devices.get(device_id)
+        fields = known.to_dict() if known else {}
+        fields.update(event)
+        self.update(Device.from_json(fields))
+
+    def collect(self, now=None):
+        """Flags devices whose deadline has passed and returns (newly stale, recovered)."""
+        now = time.time() if now is None else now
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                deadline, device_id = heapq.heappop(self.heap)
+                if self.deadlines.get(device_id) != deadline:
+                    continue  # Superseded by a later check-in or removed
+                del self.deadlines[device_id]
+                self.stale[device_id] = self.devices[device_id]
+                self.newly_stale.append(self.devices[device_id])
+            newly_stale, self.newly_stale = self.newly_stale, []
+            recovered, self.recovered = self.recovered, []
+        return newly_stale, recovered
+
+    def next_deadline(self):
+        """When the next device goes stale, or None."""
+        with self.lock:
+            while self.heap and self.deadlines.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+            return self.heap[0][0] if self.heap else None
+
+    def status(self):
+        deadline = self.next_deadline()
+        return {
+            "tracked": len(self.devices),
+            "stale": len(self.stale),
+            "next_deadline": datetime.fromtimestamp(deadline, timezone.utc).isoformat() if deadline else None,
+        }
@@ -0,0 +1,231 @@
+"""
+Runs the Daily Checks against several Kandji tenants in parallel.
+
+Tenants are described in a JSON manifest:
+
+    {
+      "tenants": [
+        {
+          "name": "acme",
+          "base_url": "https://acme.api.kandji.io",
+          "token_env": "ACME_KANDJI_TOKEN",
+          "slack_channel": "C0123456789",
+          "slack_webhook_env": "ACME_SLACK_WEBHOOK",
+          "rate_limit": 5,
+          "checks": ["checkin24Hours", "hardDrive70"]
+        }
+      ]
+    }
+
+Secrets stay out of the manifest: token_env and slack_webhook_env name the
+environment variables that hold them. rate_limit (Kandji API requests per
+second) and checks (default: all) are optional.
+
+Every tenant runs in a fresh process of its own, so it gets its own connection
+pool, rate limit, device inventory and state directory, and a slow or failing
+tenant cannot hold up the others beyond its own worker slot.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+import traceback
+
+from .checks import CHECKS, CheckError, load
+from .config import Config
+from .delta import state_dir
+from .instrumentation import RunStats
+from .inventory import Inventory
+from .kandji import KandjiClient
+from .metrics import snapshot_dir
+
+TENANT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+def load_manifest(path):
+    """Reads and validates the tenant manifest, raising ValueError on problems."""
+    with open(path) as f:
+        manifest = json.load(f)
+    tenants = manifest.get("tenants") if isinstance(manifest, dict) else None
+    if not isinstance(tenants, list) or not tenants:
+        raise ValueError(f"{path}: expected a non-empty \"tenants\" list")
+    names = set()
+    for tenant in tenants:
+        if not isinstance(tenant, dict):
+            raise ValueError(f"{path}: expected each tenant to be an object, got {tenant!r}")
+        name = tenant.get("name", "")
+        if not isinstance(name, str) or not TENANT_NAME.match(name):
+            raise ValueError(f"{path}: invalid tenant name {name!r}")
+        if name in names:
+            raise ValueError(f"{path}: duplicate tenant name {name!r}")
+        names.add(name)
+        for key in ("base_url", "token_env", "slack_channel", "slack_webhook_env"):
+            if not tenant.get(key):
+                raise ValueError(f"{path}: tenant {name!r} is missing {key!r}")
+        rate_limit = tenant.get("rate_limit", 0)
+        is_number = isinstance(rate_limit, (int, float)) and not isinstance(rate_limit, bool)
+        if not is_number or not 0 <= rate_limit < float("inf"):
+            raise ValueError(f"{path}: tenant {name!r} has an invalid rate_limit {rate_limit!r}, expected a non-negative number")
+        checks = tenant.get("checks", [])
+        if not isinstance(checks, list) or not all(isinstance(check, str) for check in checks):
+            raise ValueError(f"{path}: tenant {name!r} has a \"checks\" entry that is not a list of check names")
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"{path}: tenant {name!r} has unknown checks {', '.join(sorted(unknown))}")
+    return tenants
+
+
+def tenant_settings(tenant, directory=None):
+    """The Kandji and Slack settings, rate limit and state directory of one tenant."""
+    missing = [tenant[key] for key in ("token_env", "slack_webhook_env") if not os.getenv(tenant[key])]
+    if missing:
+        raise ValueError(f"missing environment variables: {', '.join(missing)}")
+    return {
+        "config": Config(
+            api_token=os.getenv(tenant["token_env"]),
+            base_url=tenant["base_url"],
+            slack_channel=tenant["slack_channel"],
+            slack_webhook_url=os.getenv(tenant["slack_webhook_env"]),
+        ),
+        "rate_limit": float(tenant.get("rate_limit", 0)),
+        "state_dir": os.path.join(state_dir(directory), "tenants", tenant["name"]),
+    }
+
+
+def snapshot_totals(directory, since=0):
+    """
+    Unlabelled gauge values, e.g. device counts, from the tenant's metrics
+    snapshots written at or after since. Older snapshots are left over from
+    earlier runs of checks that failed this time.
+    """
+    totals = {}
+    metrics_dir = snapshot_dir(directory)
+    try:
+        names = sorted(os.listdir(metrics_dir))
+    except OSError:
+        return totals
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(metrics_dir, name)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if snapshot.get("updated", 0) < since:
+            continue
+        for family in snapshot["families"]:
+            if family["type"] != "gauge":
+                continue
+            for sample_name, labels, value in family["samples"]:
+                if not labels:
+                    totals[sample_name] = value
+    return totals
+
+
+def run_tenant(tenant, settings, options):
+    """Runs one tenant's checks in its worker process against one shared inventory."""
+    started = time.time()
+    config = settings["config"]
+    client = KandjiClient(config.base_url, config.api_token, rate_limit=settings["rate_limit"])
+    inventory = Inventory(client)
+    results = {}
+    for name in tenant.get("checks") or CHECKS:
+        stats = RunStats(f"{tenant['name']}/{name}", debug=options["debug"])
+        client.stats = stats
+        args = dict(options, profile=None, summary=None, state_dir=settings["state_dir"], resume=True,
+                    shard=None, merge=None, shard_dir=None)
+        try:
+            load(name).main(stats, argparse.Namespace(**args), inventory, config)
+            status = "ok"
+        except CheckError as e:
+            print(e)
+            status = f"error: {e}"
+        except Exception as e:
+            traceback.print_exc()
+            status = f"error: {e}"
+        results[name] = {"status": status, "summary": stats.summary()}
+    return {
+        "tenant": tenant["name"],
+        "duration_seconds": round(time.time() - started, 3),
+        "checks": results,
+        "totals": snapshot_totals(settings["state_dir"], since=started),
+    }
+
+
+def _run_tenant_safely(job):
+    tenant, settings, options = job
+    try:
+        return run_tenant(tenant, settings, options)
+    except Exception as e:
+        traceback.print_exc()
+        return {"tenant": tenant["name"], "error": str(e), "checks": {}, "totals": {}}
+
+
+def run_tenants(tenants, options, workers=None, directory=None):
+    """
+    Runs every tenant in a pool of worker processes and returns the per-tenant
+    results in manifest order. Each worker process serves a single tenant.
+    """
+    results = {}
+    jobs = []
+    for tenant in tenants:
+        try:
+            jobs.append((tenant, tenant_settings(tenant, directory), options))
+        except ValueError as e:
+            results[tenant["name"]] = {"tenant": tenant["name"], "error": str(e), "checks": {}, "totals": {}}
+    if jobs:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=min(workers or len(jobs), len(jobs)), maxtasksperchild=1) as pool:
+            for result in pool.imap_unordered(_run_tenant_safely, jobs):
+                results[result["tenant"]] = result
+                print(f"{result['tenant']}: {tenant_status(result)}")
+    return [results[tenant["name"]] for tenant in tenants]
+
+
+def tenant_status(result):
+    if result.get("error"):
+        return f"error: {result['error']}"
+    failed = [name for name, check in result["checks"].items() if check["status"] != "ok"]
+    return f"{len(failed)} of {len(result['checks'])} checks failed" if failed else "ok"
+
+
+def combine(results):
+    """The combined report: per-tenant results plus totals across all tenants."""
+    totals = {}
+    requests = 0
+    failed = []
+    for result in results:
+        for key, value in result["totals"].items():
+            totals[key] = totals.get(key, 0) + value
+        for name, check in result["checks"].items():
+            requests += check["summary"]["requests"]["count"]
+            if check["status"] != "ok":
+                failed.append(f"{result['tenant']}/{name}")
+        if result.get("error"):
+            failed.append(result["tenant"])
+    return {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "tenants": results,
+        "combined": {"tenants": len(results), "requests": requests, "failed": failed, "totals": totals},
+    }
+
+
+def format_report(report):
+    lines = []
+    keys = sorted(report["combined"]["totals"])
+    for result in report["tenants"]:
+        lines.append(f"{result['tenant']}: {tenant_status(result)}")
+        for key in keys:
+            if key in result["totals"]:
+                lines.append(f"    {key}: {result['totals'][key]}")
+    combined = report["combined"]
+    lines.append(f"All {combined['tenants']} tenants ({combined['requests']} API requests):")
+    for key in keys:
+        lines.append(f"    {key}: {combined['totals'][key]}")
+    if combined["failed"]:
+        lines.append(f"Failed: {', '.join(combined['failed'])}")
+    return "\n".join(lines)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Serves the fleet health data computed by the Daily Checks as Prometheus
+metrics. The exporter only reads the snapshots the checks write to the state
+directory, so a scrape never triggers a Kandji API call.
+
+Author: Ben Rillie <ben@treducks.tech>
+WARNING: Use at your own risk.
+License: MIT
+"""
+
+import argparse
+
+from dailychecks.delta import DEFAULT_STATE_DIR
+from dailychecks.httpd import MetricsHandler, make_server
+from dailychecks.metrics import SnapshotCache
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serves Daily Checks results as Prometheus metrics.")
+    parser.add_argument("--host", default="127.0.0.1", help="listen address (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=9464, help="listen port (default 9464)")
+    parser.add_argument("--state-dir", metavar="DIR",
+                        help=f"state directory the checks write to (default: $KANDJI_CHECKS_STATE_DIR or {DEFAULT_STATE_DIR})")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    cache = SnapshotCache(args.state_dir)
+    server = make_server(args.host, args.port, MetricsHandler, cache=cache)
+    print(f"Serving {cache.directory} on http://{args.host}:{args.port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
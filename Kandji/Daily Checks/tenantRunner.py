@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Runs the Daily Checks against every Kandji tenant listed in a manifest, in
+parallel worker processes, and prints a per-tenant and combined report. Each
+tenant still gets its own Slack messages.
+
+Author: Ben Rillie <ben@treducks.tech>
+WARNING: Use at your own risk.
+License: MIT
+"""
+
+import argparse
+import json
+
+from dailychecks import tenants
+from dailychecks.delta import DEFAULT_STATE_DIR
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the Daily Checks for several Kandji tenants in parallel.")
+    parser.add_argument("manifest", help="JSON tenant manifest")
+    parser.add_argument("--workers", type=int, help="tenants to run at once (default: all)")
+    parser.add_argument("--report", metavar="PATH", help="write the combined JSON report to PATH ('-' for stdout)")
+    parser.add_argument("--delta", action="store_true", help="only post results that changed since the previous run")
+    parser.add_argument("--state-dir", metavar="DIR",
+                        help=f"parent of the per-tenant state directories (default: $KANDJI_CHECKS_STATE_DIR or {DEFAULT_STATE_DIR})")
+    parser.add_argument("--debug", action="store_true", help="print full API payloads while running")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    try:
+        manifest = tenants.load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Could not load the tenant manifest: {e}")
+        exit(1)
+
+    options = {"delta": args.delta, "debug": args.debug}
+    results = tenants.run_tenants(manifest, options, workers=args.workers, directory=args.state_dir)
+    report = tenants.combine(results)
+
+    print(tenants.format_report(report))
+    if args.report == "-":
+        print(json.dumps(report, indent=2))
+    elif args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if report["combined"]["failed"]:
+        exit(2)
+
+if __name__ == '__main__':
+    main()
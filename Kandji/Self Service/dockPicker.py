@@ -10,9 +10,18 @@ License: MIT
 
 import os
 import sys
+import json
+import hashlib
+import plistlib
 import subprocess
 import logging
+import queue
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from urllib.parse import urlparse, unquote
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
 
 # Logging Setup
@@ -29,15 +38,19 @@ def setup_logging(log_file=LOG_FILE, level=logging.INFO):
     )
     logging.info("Logging setup complete.")
 
-def run_command(command, as_user=None):
+DOCKUTIL = '/usr/local/bin/dockutil'
+
+def user_command(args, as_user=None):
+    # Run as the console user with their HOME so dockutil edits their Dock plist
     if as_user:
-        # Use a login shell to ensure user's environment is loaded
-        full_command = f"su - {as_user} -c '/usr/local/bin/dockutil {command}'"
-    else:
-        full_command = f"/usr/local/bin/dockutil {command}"
-    logging.info(f"Running command: {full_command}")
+        return ['sudo', '-H', '-u', as_user] + list(args)
+    return list(args)
+
+def run_command(args, as_user=None):
+    full_command = user_command([DOCKUTIL] + list(args), as_user=as_user)
+    logging.info(f"Running command: {' '.join(full_command)}")
     try:
-        result = subprocess.run(full_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        result = subprocess.run(full_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         logging.info(f"Command output: {result.stdout.strip()}")
         return result.stdout, result.stderr
     except subprocess.CalledProcessError as e:
@@ -45,6 +58,53 @@ def run_command(command, as_user=None):
         logging.error(f"Error output: {e.stderr.strip()}")
         raise
 
+def restart_dock(user):
+    logging.info("Restarting Dock")
+    try:
+        subprocess.run(user_command(['/usr/bin/killall', 'Dock'], as_user=user), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to restart Dock: {e.stderr.strip()}")
+
+def describe_command(args):
+    action, name = args[0], args[1]
+    if action == '--remove':
+        return "Clear Dock" if name == 'all' else f"Remove {name}"
+    if action == '--add':
+        label = args[args.index('--label') + 1] if '--label' in args else os.path.basename(name)
+        return f"Add {label}"
+    if action == '--move':
+        return f"Move {name}"
+    return ' '.join(args)
+
+def run_batch(commands, user, progress=None, cancel=None):
+    """
+    Runs each dockutil argument list with --no-restart and restarts the Dock
+    once at the end. progress(index, args, ok, error) is called after every
+    command and a set cancel event stops before the next one. Returns the
+    commands that failed.
+    """
+    failed = []
+    applied = 0
+    for index, args in enumerate(commands):
+        if cancel is not None and cancel.is_set():
+            logging.info(f"Cancelled with {len(commands) - index} Dock changes left")
+            break
+        error = ''
+        try:
+            run_command(list(args) + ['--no-restart'], as_user=user)
+            applied += 1
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.strip() or f"exit status {e.returncode}"
+        except OSError as e:
+            error = str(e)
+        if error:
+            failed.append(args)
+        if progress:
+            progress(index, args, not error, error)
+    if applied:
+        restart_dock(user)
+    return failed
+
 def log_exception(e):
     logging.error(f"Exception occurred: {e}", exc_info=True)
 
@@ -57,20 +117,440 @@ def get_console_user():
 # Set up logging
 setup_logging()
 
-def get_applications():
+# Application catalog
+APP_ROOTS = ['/Applications', '/System/Applications']
+CACHE_DIR = '/Library/Caches/dockPicker'
+CATALOG_CACHE = os.path.join(CACHE_DIR, 'apps.json')
+ICON_CACHE_DIR = os.path.join(CACHE_DIR, 'icons')
+SCAN_DEPTH = 2  # Follows folders such as /Applications/Utilities
+ICON_SIZE = 16
+ICON_WORKERS = 4
+
+class AppEntry:
+    """
+    An application bundle in the catalog, listed and searched by its bundle
+    name. The Info.plist and icon are read from disk only when first requested.
+    """
+    __slots__ = ('path', 'name', '_info', '_icon')
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)[:-len('.app')]
+        self._info = None
+        self._icon = None
+
+    def __repr__(self):
+        return f"AppEntry({self.path!r})"
+
+    def info(self):
+        if self._info is None:
+            try:
+                with open(os.path.join(self.path, 'Contents', 'Info.plist'), 'rb') as f:
+                    self._info = plistlib.load(f)
+            except Exception as e:
+                logging.debug(f"Could not read Info.plist for {self.path}: {e}")
+                self._info = {}
+        return self._info
+
+    def icon_file(self):
+        """Returns a PNG rendition of the bundle icon, converting it on first use."""
+        if self._icon is None:
+            self._icon = self._convert_icon() or ''
+        return self._icon or None
+
+    def _convert_icon(self):
+        icon_name = self.info().get('CFBundleIconFile')
+        if not icon_name:
+            return None
+        if not icon_name.endswith('.icns'):
+            icon_name += '.icns'
+        icns_path = os.path.join(self.path, 'Contents', 'Resources', icon_name)
+        try:
+            mtime = os.stat(icns_path).st_mtime
+        except OSError:
+            return None
+        key = hashlib.sha1(f"{icns_path}:{mtime}".encode()).hexdigest()
+        png_path = os.path.join(ICON_CACHE_DIR, f"{key}.png")
+        if os.path.exists(png_path):
+            return png_path
+        try:
+            os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+            subprocess.run(['/usr/bin/sips', '-s', 'format', 'png', '-Z', str(ICON_SIZE), icns_path, '--out', png_path],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return png_path
+        except (OSError, subprocess.CalledProcessError) as e:
+            logging.debug(f"Could not convert icon for {self.path}: {e}")
+            return None
+
+def app_roots(user=None):
+    roots = list(APP_ROOTS)
+    if user:
+        roots.append(os.path.join(os.path.expanduser(f"~{user}"), 'Applications'))
+    return roots
+
+def scan_root(root, depth=SCAN_DEPTH):
+    """
+    Walks a root with os.scandir and returns the .app bundles found together
+    with the mtime of every directory visited. Directories that do not exist,
+    such as a missing ~/Applications, are recorded with None so the cache is
+    invalidated once they appear.
+    """
+    apps = []
+    dirs = {}
+    pending = [(root, 0)]
+    while pending:
+        path, level = pending.pop()
+        try:
+            dirs[path] = os.stat(path).st_mtime
+        except OSError as e:
+            logging.debug(f"Skipping {path}: {e}")
+            dirs[path] = None
+            continue
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.name.endswith('.app'):
+                        apps.append(entry.path)
+                    elif level < depth and entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, level + 1))
+        except OSError as e:
+            logging.debug(f"Skipping {path}: {e}")
+    return apps, dirs
+
+def load_catalog_cache(roots, cache_file=CATALOG_CACHE):
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get('roots') != roots:
+        return None
+    for path, mtime in cache.get('dirs', {}).items():
+        try:
+            current = os.stat(path).st_mtime
+        except OSError:
+            current = None
+        if current != mtime:
+            return None
+    return cache.get('apps')
+
+def save_catalog_cache(roots, dirs, apps, cache_file=CATALOG_CACHE):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'roots': roots, 'dirs': dirs, 'apps': apps}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logging.warning(f"Could not write application cache: {e}")
+
+def get_applications(user=None):
     logging.debug("Getting list of applications")
-    applications_folder = "/Applications"
-    apps = [f for f in os.listdir(applications_folder) if f.endswith(".app")]
-    logging.debug(f"Found {len(apps)} applications")
-    return sorted(apps)  # Sort the apps alphabetically
+    roots = app_roots(user)
+    apps = load_catalog_cache(roots)
+    if apps is not None:
+        logging.debug("Using cached application list")
+    else:
+        with ThreadPoolExecutor(max_workers=len(roots)) as pool:
+            results = list(pool.map(scan_root, roots))
+        apps, dirs = [], {}
+        for root_apps, root_dirs in results:
+            apps.extend(root_apps)
+            dirs.update(root_dirs)
+        save_catalog_cache(roots, dirs, apps)
+    entries = sorted((AppEntry(path) for path in apps), key=lambda app: (app.name.lower(), app.path))
+    logging.debug(f"Found {len(entries)} applications")
+    return entries  # Sorted alphabetically
+
+class SearchIndex:
+    """
+    Type-to-filter lookup over the catalog. Prefix matches come from a sorted
+    key list and are listed first; substring matches follow. When the query
+    extends the previous one, only the previous matches are rescanned.
+    """
+    def __init__(self, apps):
+        self.keys = [app.name.lower() for app in apps]
+        self.sorted_keys = sorted((key, i) for i, key in enumerate(self.keys))
+        self.all = list(range(len(self.keys)))
+        self.last_query = ''
+        self.last_result = self.all
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            result = self.all
+        else:
+            if self.last_query and query.startswith(self.last_query):
+                candidates = self.last_result
+            else:
+                candidates = self.all
+            prefix = []
+            pos = bisect_left(self.sorted_keys, (query, -1))
+            while pos < len(self.sorted_keys) and self.sorted_keys[pos][0].startswith(query):
+                prefix.append(self.sorted_keys[pos][1])
+                pos += 1
+            prefix.sort()
+            prefix_set = set(prefix)
+            substring = sorted(i for i in candidates if i not in prefix_set and query in self.keys[i])
+            result = prefix + substring
+        self.last_query = query
+        self.last_result = result
+        return result
+
+class VirtualList(tk.Frame):
+    """
+    Scrollable checkbox list that only creates widgets for the visible rows and
+    re-binds them to catalog entries as the list scrolls or is filtered.
+    """
+    ICON_POLL_MS = 50
+    def __init__(self, master, apps, selected, visible_rows=20, width=420):
+        super().__init__(master)
+        self.apps = apps
+        self.selected = selected  # Set of selected bundle paths
+        self.items = list(range(len(apps)))
+        self.top = 0
+        self.visible_rows = visible_rows
+        self.icons = {}
+        self.icon_pool = ThreadPoolExecutor(max_workers=ICON_WORKERS)
+        self.icon_pending = {}  # Bundle path -> future of its icon conversion
+        self.icon_results = queue.Queue()
+        self.icon_job = None
+        self.blank_icon = tk.PhotoImage(width=ICON_SIZE, height=ICON_SIZE)
+
+        self.body = tk.Frame(self)
+        self.body.grid_columnconfigure(0, minsize=width)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body.pack(side="left", fill="both", expand=True)
+
+        self.rows = []
+        for r in range(visible_rows):
+            var = tk.BooleanVar()
+            chk = tk.Checkbutton(self.body, variable=var, anchor="w", compound="left",
+                                 image=self.blank_icon, command=lambda r=r: self.on_toggle(r))
+            chk.grid(row=r, column=0, sticky="ew", padx=5)
+            chk.bind("<MouseWheel>", self.on_mousewheel)
+            self.rows.append((chk, var))
+        self.body.bind("<MouseWheel>", self.on_mousewheel)
+        self.bind("<Destroy>", self.on_destroy)
+        self.render()
+
+    def set_items(self, items):
+        self.items = items
+        self.top = 0
+        self.render()
+
+    def max_top(self):
+        return max(0, len(self.items) - self.visible_rows)
+
+    def scroll_to(self, top):
+        top = min(max(0, top), self.max_top())
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        # macOS reports small deltas, other platforms multiples of 120
+        delta = event.delta if abs(event.delta) < 120 else event.delta // 120
+        self.scroll_to(self.top - delta)
+
+    def on_toggle(self, r):
+        pos = self.top + r
+        if pos >= len(self.items):
+            return
+        app = self.apps[self.items[pos]]
+        if self.rows[r][1].get():
+            self.selected.add(app.path)
+        else:
+            self.selected.discard(app.path)
+
+    def render(self):
+        for r, (chk, var) in enumerate(self.rows):
+            pos = self.top + r
+            if pos < len(self.items):
+                app = self.apps[self.items[pos]]
+                chk.configure(text=app.name, image=self.icons.get(app.path, self.blank_icon), state="normal")
+                var.set(app.path in self.selected)
+            else:
+                chk.configure(text="", image=self.blank_icon, state="disabled")
+                var.set(False)
+        if self.items:
+            first = self.top / len(self.items)
+            last = min(1.0, (self.top + self.visible_rows) / len(self.items))
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+        self.request_icons()
+
+    def request_icons(self):
+        # sips runs on worker threads so typing and scrolling stay responsive; the
+        # PNGs are turned into PhotoImages on the Tk thread when poll_icons picks them up
+        visible = set()
+        for pos in range(self.top, min(self.top + self.visible_rows, len(self.items))):
+            app = self.apps[self.items[pos]]
+            visible.add(app.path)
+            pending = self.icon_pending.get(app.path)
+            if app.path in self.icons or (pending and not pending.cancelled()):
+                continue
+            future = self.icon_pool.submit(app.icon_file)
+            self.icon_pending[app.path] = future
+            future.add_done_callback(lambda future, path=app.path: self.icon_results.put((path, future)))
+        # Conversions for rows scrolled out of view are dropped if they have not started yet
+        for path, future in self.icon_pending.items():
+            if path not in visible:
+                future.cancel()
+        if self.icon_pending and self.icon_job is None:
+            self.icon_job = self.after(self.ICON_POLL_MS, self.poll_icons)
+
+    def poll_icons(self):
+        self.icon_job = None
+        loaded = False
+        while True:
+            try:
+                path, future = self.icon_results.get_nowait()
+            except queue.Empty:
+                break
+            if self.icon_pending.get(path) is not future:
+                continue
+            del self.icon_pending[path]
+            if future.cancelled():
+                continue
+            icon_file = None if future.exception() else future.result()
+            try:
+                self.icons[path] = tk.PhotoImage(file=icon_file) if icon_file else self.blank_icon
+            except tk.TclError:
+                self.icons[path] = self.blank_icon
+            loaded = True
+        if loaded:
+            for r, (chk, var) in enumerate(self.rows):
+                pos = self.top + r
+                if pos < len(self.items):
+                    chk.configure(image=self.icons.get(self.apps[self.items[pos]].path, self.blank_icon))
+        if self.icon_pending:
+            self.icon_job = self.after(self.ICON_POLL_MS, self.poll_icons)
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.icon_pool.shutdown(wait=False, cancel_futures=True)
+
+class ProgressView(tk.Frame):
+    """
+    Shows per-change progress while a worker thread applies the Dock changes.
+    The worker reports through a queue that is polled from the Tk event loop.
+    """
+    POLL_MS = 100
+
+    def __init__(self, master, commands, user, on_done):
+        super().__init__(master)
+        self.commands = commands
+        self.on_done = on_done
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.failed = []
+        self.finished = False
+
+        self.status_label = tk.Label(self, anchor="w", text=f"Applying {len(commands)} Dock changes...")
+        self.status_label.pack(side="top", fill="x", padx=5, pady=5)
+        self.progress_bar = ttk.Progressbar(self, maximum=len(commands), length=420, mode="determinate")
+        self.progress_bar.pack(side="top", fill="x", padx=5)
+        self.results = tk.Listbox(self, height=min(15, max(5, len(commands))), width=60)
+        self.results.pack(side="top", fill="both", expand=True, padx=5, pady=5)
+        for args in commands:
+            self.results.insert("end", f"  {describe_command(args)}")
+        self.close_button = tk.Button(self, text="Cancel", command=self.on_cancel, width=10)
+        self.close_button.pack(side="bottom", pady=(0, 10))
+
+        # Dock changes are applied one at a time because every dockutil call
+        # rewrites the same preferences file
+        self.worker = threading.Thread(target=self.work, args=(user,), daemon=True)
+        self.worker.start()
+        self.after(self.POLL_MS, self.poll)
+
+    def work(self, user):
+        try:
+            failed = run_batch(self.commands, user,
+                               progress=lambda *step: self.events.put(("step",) + step),
+                               cancel=self.cancel_event)
+        except Exception as e:
+            log_exception(e)
+            failed = None
+        self.events.put(("done", failed))
+
+    def poll(self):
+        try:
+            while True:
+                event = self.events.get_nowait()
+                if event[0] == "step":
+                    self.show_step(*event[1:])
+                else:
+                    self.show_done(event[1])
+                    return
+        except queue.Empty:
+            pass
+        self.after(self.POLL_MS, self.poll)
+
+    def show_step(self, index, args, ok, error):
+        description = describe_command(args)
+        self.results.delete(index)
+        if ok:
+            self.results.insert(index, f"\u2713 {description}")
+        else:
+            self.results.insert(index, f"\u2717 {description}: {error}")
+            self.results.itemconfigure(index, foreground="red")
+            self.failed.append(args)
+        self.results.see(index)
+        self.progress_bar["value"] = index + 1
+
+    def show_done(self, failed):
+        self.finished = True
+        if failed is None:
+            self.failed = None
+            self.status_label.configure(text="Updating the Dock failed, see the log for details.")
+        elif self.cancel_event.is_set():
+            self.status_label.configure(text=f"Cancelled after {int(self.progress_bar['value'])} of {len(self.commands)} changes.")
+        elif failed:
+            self.status_label.configure(text=f"{len(failed)} of {len(self.commands)} changes failed.")
+        else:
+            self.status_label.configure(text="Dock updated successfully.")
+        self.close_button.configure(text="Close", command=self.on_close, state="normal")
+        logging.info(self.status_label.cget("text"))
+        if failed == [] and not self.cancel_event.is_set():
+            self.after(1500, self.on_close)
+
+    def on_cancel(self):
+        logging.info("Cancelling Dock changes")
+        self.cancel_event.set()
+        self.status_label.configure(text="Cancelling after the current change...")
+        self.close_button.configure(state="disabled")
+
+    def on_close(self):
+        self.on_done(self.failed, self.cancel_event.is_set())
 
 class AppSelector(tk.Tk):
-    def __init__(self, apps):
+    def __init__(self, apps, user, current_dock=None):
         super().__init__()
         self.title("Select Applications")
         self.apps = apps
+        self.user = user
+        self.current_dock = current_dock
+        # Pre-check apps that are already in the Dock
+        checked = {item.path for item in current_dock or []}
+        self.selected = {app.path for app in apps if app.path in checked}
         self.selected_apps = []
+        self.failed = None
+        self.cancelled = False
+        self.progress_view = None
         self.dont_clear_dock = tk.BooleanVar()
+        self.protocol("WM_DELETE_WINDOW", self.on_window_close)
 
         self.create_widgets()
         self.update_idletasks()
@@ -96,33 +576,19 @@ class AppSelector(tk.Tk):
         self.frame = tk.Frame(self)
         self.frame.pack(fill="both", expand=True)
 
-        self.canvas = tk.Canvas(self.frame)
-        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.scrollbar.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True)
-
-        self.inner_frame = tk.Frame(self.canvas)
-        self.canvas.create_window((0, 0), window=self.inner_frame, anchor="nw")
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self.frame, textvariable=self.search_var)
+        self.search_entry.pack(side="top", fill="x", padx=5, pady=5)
+        self.search_var.trace_add("write", self.on_search)
 
-        self.checkbuttons = []
-        self.vars = []
+        self.count_label = tk.Label(self.frame, anchor="w")
+        self.count_label.pack(side="top", fill="x", padx=5)
 
-        columns = 5
-        rows = -(-len(self.apps) // columns)  # Ceiling division to get number of rows
-
-        for i, app in enumerate(self.apps):
-            var = tk.BooleanVar()
-            chk = tk.Checkbutton(self.inner_frame, text=app, variable=var)
-            row = i % rows
-            col = i // rows
-            chk.grid(row=row, column=col, sticky="w", padx=5, pady=2)
-            self.checkbuttons.append(chk)
-            self.vars.append(var)
-
-        self.inner_frame.update_idletasks()
-        self.canvas.config(width=self.inner_frame.winfo_reqwidth(), height=min(500, self.inner_frame.winfo_reqheight()))
+        self.search_index = SearchIndex(self.apps)
+        self.app_list = VirtualList(self.frame, self.apps, self.selected)
+        self.app_list.pack(side="top", fill="both", expand=True)
+        self.update_count()
+        self.search_entry.focus_set()
 
         self.button_frame = tk.Frame(self)
         self.button_frame.pack(side="bottom", fill="x", pady=(0, 10))
@@ -141,15 +607,25 @@ class AppSelector(tk.Tk):
         self.empty_dock_button.grid(row=0, column=4, padx=5)
         logging.debug("Widgets created")
 
+    def update_count(self):
+        self.count_label.configure(text=f"{len(self.app_list.items)} of {len(self.apps)} applications")
+
+    def on_search(self, *args):
+        self.app_list.set_items(self.search_index.search(self.search_var.get()))
+        self.update_count()
+
     def on_ok(self):
-        self.selected_apps = [app for app, var in zip(self.apps, self.vars) if var.get()]
+        self.selected_apps = [app for app in self.apps if app.path in self.selected]
         if not self.selected_apps:
             logging.info("No applications selected, exiting without changes")
             self.selected_apps = None
-        else:
-            logging.info(f"Selected apps: {self.selected_apps}")
-            logging.info(f"Don't Clear Dock: {self.dont_clear_dock.get()}")
-        self.destroy()
+            self.destroy()
+            return
+        logging.info(f"Selected apps: {[app.name for app in self.selected_apps]}")
+        logging.info(f"Don't Clear Dock: {self.dont_clear_dock.get()}")
+        keep_existing = self.dont_clear_dock.get()
+        target = dock_target(self.current_dock, self.selected_apps, keep_existing=keep_existing)
+        self.apply_changes(plan_dock_changes(self.current_dock, target, keep_existing=keep_existing))
 
     def on_cancel(self):
         logging.info("Selection cancelled")
@@ -159,24 +635,139 @@ class AppSelector(tk.Tk):
     def on_empty_dock(self):
         logging.info("Empty Dock selected")
         self.selected_apps = []
+        self.apply_changes([['--remove', 'all']])
+
+    def on_window_close(self):
+        if self.progress_view is None:
+            self.on_cancel()
+        elif self.progress_view.finished:
+            self.progress_view.on_close()
+        else:
+            self.progress_view.on_cancel()
+
+    def apply_changes(self, commands):
+        if not commands:
+            logging.info("Dock already matches the selection, nothing to do")
+            self.failed = []
+            self.destroy()
+            return
+        logging.info(f"Applying {len(commands)} Dock changes")
+        self.frame.pack_forget()
+        self.button_frame.pack_forget()
+        self.title("Updating Dock")
+        self.progress_view = ProgressView(self, commands, self.user, on_done=self.on_changes_done)
+        self.progress_view.pack(fill="both", expand=True)
+        self.geometry("")
+
+    def on_changes_done(self, failed, cancelled):
+        self.failed = failed
+        self.cancelled = cancelled
         self.destroy()
 
-def clear_dock(user):
-    logging.info("Clearing Dock")
-    run_command("--remove all", as_user=user)
+# Dock state
+DockItem = namedtuple('DockItem', ['label', 'path'])
 
-def add_to_dock(apps, user):
-    logging.info(f"Adding {len(apps)} apps to Dock")
-    for app in apps:
-        app_path = f"/Applications/{app}"
-        escaped_path = app_path.replace(" ", r"\ ")
-        logging.debug(f"Adding {escaped_path} to Dock")
-        try:
-            run_command(f"--add {escaped_path}", as_user=user)
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to add {app} to Dock: {e}")
-            # Continue with the next app instead of raising an exception
-            continue
+def url_to_path(url):
+    path = unquote(urlparse(url).path)
+    return os.path.normpath(path) if path else ''
+
+def read_dock(user):
+    """
+    Returns the persistent apps in the user's Dock from dockutil --list, or None
+    if the Dock could not be read.
+    """
+    try:
+        output, _ = run_command(['--list'], as_user=user)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.warning(f"Could not read current Dock: {e}")
+        return None
+    items = []
+    for line in output.splitlines():
+        parts = line.split('\t')
+        if len(parts) >= 3 and parts[2] == 'persistentApps':
+            items.append(DockItem(parts[0], url_to_path(parts[1])))
+    logging.info(f"Current Dock has {len(items)} apps")
+    return items
+
+def dock_target(current, selected_apps, keep_existing=False):
+    """
+    Builds the desired Dock. Apps already in the Dock keep their order and newly
+    selected apps are appended. With keep_existing nothing is removed.
+    """
+    selected = {app.path for app in selected_apps}
+    target = []
+    seen = set()
+    for item in current or []:
+        if item.path not in seen and (keep_existing or item.path in selected):
+            target.append(item)
+            seen.add(item.path)
+    for app in selected_apps:
+        if app.path not in seen:
+            target.append(DockItem(app.name, app.path))
+            seen.add(app.path)
+    return target
+
+def stable_paths(current_paths, target_paths):
+    """
+    Returns the longest run of current Dock paths that is already in target
+    order. Those items stay put and everything else is moved around them.
+    """
+    order = {path: i for i, path in enumerate(target_paths)}
+    seq = [order[path] for path in current_paths if path in order]
+    tails, tail_index, previous = [], [], [None] * len(seq)
+    for i, value in enumerate(seq):
+        k = bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+        previous[i] = tail_index[k - 1] if k else None
+    stable = set()
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        stable.add(target_paths[seq[i]])
+        i = previous[i]
+    return stable
+
+def plan_dock_changes(current, target, keep_existing=False):
+    """
+    Returns the dockutil argument lists that turn the current Dock into the
+    target: removals, then moves and adds placed after their predecessor.
+    """
+    if current is None:
+        # Current state unknown: rebuild the Dock, or only add the selection when keeping it
+        adds = [['--add', item.path, '--label', item.label] for item in target]
+        return adds if keep_existing else [['--remove', 'all']] + adds
+
+    wanted = {item.path for item in target}
+    counts = {}
+    for item in current:
+        counts[item.path] = counts.get(item.path, 0) + 1
+
+    commands = []
+    present = {}
+    for item in current:
+        # Duplicates are removed by label together and re-added once below
+        if item.path not in wanted or counts[item.path] > 1:
+            if ['--remove', item.label] not in commands:
+                commands.append(['--remove', item.label])
+        else:
+            present[item.path] = item
+
+    stable = stable_paths([item.path for item in current if item.path in present],
+                          [item.path for item in target])
+    previous = None
+    for item in target:
+        if item.path not in stable:
+            where = ['--after', previous.label] if previous else ['--position', 'beginning']
+            if item.path in present:
+                commands.append(['--move', present[item.path].label] + where)
+            else:
+                commands.append(['--add', item.path, '--label', item.label] + where)
+        previous = present.get(item.path, item)
+    return commands
 
 def main():
     logging.info("Starting Dock Cleaner application")
@@ -190,25 +781,22 @@ def main():
 
         logging.info(f"Console user: {console_user}")
 
-        apps = get_applications()
-        app_selector = AppSelector(apps)
+        apps = get_applications(console_user)
+        current_dock = read_dock(console_user)
+        app_selector = AppSelector(apps, console_user, current_dock)
         app_selector.mainloop()
-        selected_apps = app_selector.selected_apps
-        dont_clear_dock = app_selector.dont_clear_dock.get()
 
-        if selected_apps is None:
+        if app_selector.selected_apps is None:
             logging.info("No changes made to the Dock")
-        elif len(selected_apps) > 0:
-            if not dont_clear_dock:
-                logging.info("Clearing dock before adding selected applications")
-                clear_dock(console_user)
-            logging.info("Adding selected applications to Dock")
-            add_to_dock(selected_apps, console_user)
-            logging.info("Dock updated successfully")
+        elif app_selector.failed is None:
+            logging.error("Dock update did not complete")
+        elif app_selector.failed:
+            for args in app_selector.failed:
+                logging.error(f"Failed to run dockutil {' '.join(args)}")
+        elif app_selector.cancelled:
+            logging.info("Dock update cancelled")
         else:
-            logging.info("Emptying dock")
-            clear_dock(console_user)
-            logging.info("Dock emptied successfully")
+            logging.info("Dock updated successfully")
 
     except Exception as e:
         log_exception(e)